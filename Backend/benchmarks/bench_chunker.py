@@ -0,0 +1,109 @@
+"""
+Benchmark the offset-based DocumentChunker against the previous implementation
+
+Usage (from the Backend directory):
+    python benchmarks/bench_chunker.py [--repeat 20]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag import DocumentChunker  # noqa: E402
+
+
+def legacy_clean_text(text: str) -> str:
+    """clean_text as it was before offsets were introduced"""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\,\-\(\)\:\;]', '', text)
+    return text.strip()
+
+
+def legacy_chunk_text(text: str, chunk_size: int = 300, overlap: int = 50) -> List[str]:
+    """chunk_text as it was: re-cleans, splits into words and re-joins windows"""
+    if not text:
+        return []
+
+    text = legacy_clean_text(text)
+    words = text.split()
+
+    if len(words) <= chunk_size:
+        return [text]
+
+    chunks = []
+    start = 0
+
+    while start < len(words):
+        end = start + chunk_size
+        chunks.append(' '.join(words[start:end]))
+        start = end - overlap
+
+    return chunks
+
+
+def synthetic_resume(n_sentences: int, seed: int = 0) -> str:
+    """Resume-like text with sentences of varying length"""
+    rng = random.Random(seed)
+    words = [
+        "designed", "built", "Python", "services", "FastAPI", "PostgreSQL", "latency",
+        "reduced", "team", "Kubernetes", "pipelines", "customers", "migrated", "AWS",
+        "dashboards", "mentored", "engineers", "throughput", "(40%)", "APIs"
+    ]
+    sentences = []
+    for i in range(n_sentences):
+        length = rng.randint(6, 30)
+        sentences.append(" ".join(rng.choice(words) for _ in range(length)) + ".")
+        if i % 7 == 6:
+            sentences.append("\n\nEXPERIENCE:\n")
+    return " ".join(sentences)
+
+
+def time_call(func, repeat: int) -> float:
+    """Best wall time in milliseconds over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    chunkers = {
+        # Same window as the legacy call for a like-for-like comparison
+        "token@300": DocumentChunker(chunk_size=300, overlap=50, mode="token"),
+        "token": DocumentChunker(mode="token"),
+        "sentence": DocumentChunker(mode="sentence"),
+    }
+
+    print(f"{'sentences':>9} {'impl':>9} {'ms':>8} {'chunks':>7} {'avg tokens':>10}")
+    for n_sentences in (40, 200, 1000, 5000):
+        raw = synthetic_resume(n_sentences)
+        cleaned = legacy_clean_text(raw)
+
+        legacy_chunks = legacy_chunk_text(cleaned)
+        rows = [("legacy", time_call(lambda: legacy_chunk_text(cleaned), args.repeat), legacy_chunks)]
+        for name, chunker in chunkers.items():
+            chunks = chunker.chunk_text(cleaned)
+            rows.append((name, time_call(lambda: chunker.chunk_text(cleaned), args.repeat), chunks))
+
+        for name, elapsed, chunks in rows:
+            avg_tokens = sum(len(c.split()) for c in chunks) / max(len(chunks), 1)
+            print(f"{n_sentences:>9} {name:>9} {elapsed:>8.3f} {len(chunks):>7} {avg_tokens:>10.1f}")
+
+        # Spans must point back into the source text
+        for chunk in chunkers["sentence"].chunk_with_spans(cleaned):
+            assert cleaned[chunk.start:chunk.end] == chunk.text
+
+
+if __name__ == "__main__":
+    main()
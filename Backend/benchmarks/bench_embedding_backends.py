@@ -0,0 +1,152 @@
+"""
+Compare embedding backends: throughput, memory and parity with PyTorch
+
+Each backend is measured in its own process so its resident memory is not
+mixed with the others; embeddings are passed back through .npy files and
+compared with the torch backend's output.
+
+Usage (from the Backend directory, after embedding_backends.py export):
+    python benchmarks/bench_embedding_backends.py --model-dir models/minilm
+    python benchmarks/bench_embedding_backends.py --model-dir models/minilm --threads 1 --output backends.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.corpus import make_resume_text  # noqa: E402
+from embedding_backends import BACKENDS, PARITY_THRESHOLDS, cosine_parity, load_backend  # noqa: E402
+from rag import DocumentChunker  # noqa: E402
+
+
+def max_rss_kb() -> int:
+    """Peak resident set size of this process (kilobytes on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+
+def build_texts(count: int) -> List[str]:
+    """Resume chunks as the pipeline would embed them"""
+    chunker = DocumentChunker()
+    texts = []
+    seed = 0
+    while len(texts) < count:
+        texts.extend(chunker.chunk_text(chunker.clean_text(make_resume_text(1200, seed=seed))))
+        seed += 1
+    return texts[:count]
+
+
+def run_worker(args) -> Dict[str, Any]:
+    """Measure one backend in this process"""
+    texts = build_texts(args.texts)
+    rss_before = max_rss_kb()
+
+    start = time.perf_counter()
+    model = load_backend(args.worker, args.model_dir, args.model_dir, threads=args.threads)
+    model.encode(texts[:2], batch_size=2)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = max_rss_kb()
+
+    throughput = {}
+    embeddings = None
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        elapsed = time.perf_counter() - start
+        throughput[str(batch_size)] = round(len(texts) / elapsed, 1)
+
+    np.save(args.embeddings_out, np.asarray(embeddings, dtype=np.float32))
+    return {
+        "backend": args.worker,
+        "load_seconds": round(load_seconds, 3),
+        "texts_per_second": throughput,
+        "model_rss_kb": rss_loaded - rss_before,
+        "max_rss_kb": max_rss_kb(),
+    }
+
+
+def measure_backend(backend: str, args, workdir: str) -> Dict[str, Any]:
+    """Run the worker for one backend in a fresh interpreter"""
+    embeddings_out = os.path.join(workdir, f"{backend}.npy")
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--worker", backend,
+        "--model-dir", args.model_dir,
+        "--texts", str(args.texts),
+        "--batch-sizes", ",".join(str(size) for size in args.batch_sizes),
+        "--threads", str(args.threads),
+        "--embeddings-out", embeddings_out,
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    record = json.loads(completed.stdout.strip().splitlines()[-1])
+    record["embeddings"] = embeddings_out
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--model-dir", required=True, help="Directory written by embedding_backends.py export")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends to compare")
+    parser.add_argument("--texts", type=int, default=512, help="Number of resume chunks to embed")
+    parser.add_argument("--batch-sizes", default="1,32", help="Comma-separated batch sizes")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime intra-op threads (0 = one per core)")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+
+    if args.worker:
+        record = run_worker(args)
+        print(json.dumps(record))
+        return
+
+    backends = args.backends.split(",")
+    with tempfile.TemporaryDirectory(prefix="bench-backends-") as workdir:
+        results = [measure_backend(backend, args, workdir) for backend in backends]
+
+        reference = next((r for r in results if r["backend"] == "torch"), None)
+        if reference is not None:
+            expected = np.load(reference["embeddings"])
+            for record in results:
+                if record["backend"] in PARITY_THRESHOLDS:
+                    stats = cosine_parity(expected, np.load(record["embeddings"]))
+                    threshold = PARITY_THRESHOLDS[record["backend"]]
+                    record["parity"] = {**stats, "threshold": threshold, "passed": stats["min_cosine"] >= threshold}
+        for record in results:
+            del record["embeddings"]
+
+    batch_columns = "".join(f"{f'b={size} txt/s':>13}" for size in args.batch_sizes)
+    print(f"{'backend':<10} {'load s':>7}{batch_columns} {'model MB':>9} {'max RSS MB':>11} {'min cos':>8}")
+    for record in results:
+        rates = "".join(f"{record['texts_per_second'][str(size)]:>13.1f}" for size in args.batch_sizes)
+        parity = record.get("parity")
+        cosine = f"{parity['min_cosine']:.5f}" if parity else "-"
+        print(
+            f"{record['backend']:<10} {record['load_seconds']:>7.2f}{rates} "
+            f"{record['model_rss_kb'] / 1024:>9.1f} {record['max_rss_kb'] / 1024:>11.1f} {cosine:>8}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"texts": args.texts, "threads": args.threads, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if any(not record.get("parity", {"passed": True})["passed"] for record in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
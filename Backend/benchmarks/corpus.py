@@ -0,0 +1,174 @@
+"""
+Synthetic resume corpus for offline benchmarks
+
+Generates resume-like text of a given length and renders it into a minimal
+multi-page PDF without any PDF authoring dependency.
+
+Usage (from the Backend directory):
+    python benchmarks/corpus.py --output /tmp/corpus --sizes 300,1200,5000 --count 5
+"""
+import os
+import random
+import argparse
+import textwrap
+from typing import Dict, List
+
+SECTIONS = ["SUMMARY", "EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION"]
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Redis", "Docker", "Kubernetes",
+    "AWS", "Terraform", "React", "TypeScript", "Kafka", "Airflow", "Spark",
+    "scikit-learn", "PyTorch", "CI/CD", "GraphQL", "Go", "Java"
+]
+
+VERBS = [
+    "Designed", "Built", "Led", "Migrated", "Optimized", "Automated",
+    "Shipped", "Maintained", "Mentored", "Scaled"
+]
+
+OBJECTS = [
+    "a billing service", "the data pipeline", "internal APIs", "a search backend",
+    "deployment tooling", "the reporting platform", "customer dashboards",
+    "an event ingestion system", "the recommendation engine", "monitoring and alerting"
+]
+
+RESULTS = [
+    "reducing p99 latency by {n}%", "serving {n}k requests per minute",
+    "cutting infrastructure cost by {n}%", "for {n} enterprise customers",
+    "improving throughput {n}x", "with a team of {n} engineers"
+]
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer with strong Python, FastAPI and PostgreSQL "
+    "experience. You will build APIs on AWS with Docker and Kubernetes, own CI/CD "
+    "pipelines and work with Kafka and Redis. Experience with Terraform and "
+    "monitoring is a plus."
+)
+
+
+def make_resume_text(n_words: int, seed: int = 0) -> str:
+    """
+    Generate resume-like text of roughly n_words words
+
+    Args:
+        n_words: Target number of words
+        seed: Random seed (different seeds give different documents)
+
+    Returns:
+        Resume text with section headings and bullet sentences
+    """
+    rng = random.Random(seed)
+    lines = [f"Candidate {seed} - Software Engineer - candidate{seed}@example.com"]
+    words = len(lines[0].split())
+
+    while words < n_words:
+        section = SECTIONS[len(lines) % len(SECTIONS)]
+        lines.append(f"{section}:")
+        for _ in range(rng.randint(3, 8)):
+            sentence = "{} {} using {} and {}, {}.".format(
+                rng.choice(VERBS),
+                rng.choice(OBJECTS),
+                rng.choice(SKILLS),
+                rng.choice(SKILLS),
+                rng.choice(RESULTS).format(n=rng.randint(2, 90))
+            )
+            lines.append(f"- {sentence}")
+            words += len(sentence.split()) + 1
+        words += 1
+
+    return "\n".join(lines)
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str, lines_per_page: int = 50, width: int = 90) -> bytes:
+    """
+    Render text into a PDF with one Helvetica text stream per page
+
+    Args:
+        text: Document text
+        lines_per_page: Wrapped lines per page
+        width: Characters per wrapped line
+
+    Returns:
+        PDF file content
+    """
+    lines = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, width) or [""])
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object 1: catalog, 2: page tree, 3: font, then a (page, content) pair per page
+    objects = [None, None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 40 760 Td 14 TL " + " ".join(
+            f"({_escape(line)}) '" for line in page_lines
+        ) + " ET"
+        page_id, content_id = len(objects) + 1, len(objects) + 2
+        page_ids.append(page_id)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {content_id} 0 R /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+
+    objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def build_corpus(sizes: List[int], count: int, seed: int = 0) -> Dict[int, List[bytes]]:
+    """
+    Build distinct PDFs for every size
+
+    Args:
+        sizes: Document sizes in words
+        count: Documents per size
+        seed: Base random seed
+
+    Returns:
+        Mapping of size to PDF contents
+    """
+    return {
+        size: [make_pdf(make_resume_text(size, seed + size * 1000 + i)) for i in range(count)]
+        for size in sizes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic resume PDF corpus")
+    parser.add_argument("--output", required=True, help="Directory for the generated PDFs")
+    parser.add_argument("--sizes", default="300,1200,5000", help="Comma-separated sizes in words")
+    parser.add_argument("--count", type=int, default=5, help="Documents per size")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    for size, pdfs in build_corpus(sizes, args.count).items():
+        for i, pdf in enumerate(pdfs):
+            with open(os.path.join(args.output, f"resume_{size}w_{i}.pdf"), "wb") as f:
+                f.write(pdf)
+    print(f"Wrote {len(sizes) * args.count} PDFs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
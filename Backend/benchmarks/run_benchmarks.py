@@ -0,0 +1,268 @@
+"""
+Offline stage-level benchmarks for the analysis pipeline
+
+Times PDF extraction, cleaning, chunking, embedding, vector store add/search
+and the full /analyze endpoint across document sizes. Embeddings come from a
+hashing stub (or the configured model with --real-embeddings) and the LLM is
+the local stub_openai server, so no network access or API key is needed.
+
+Usage (from the Backend directory):
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --output new.json --baseline results.json
+"""
+import os
+import io
+import sys
+import json
+import time
+import asyncio
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.corpus import JOB_DESCRIPTION, build_corpus  # noqa: E402
+from benchmarks.stubs import HashEmbeddingModel, start_stub_llm  # noqa: E402
+
+PERCENTILES = (50, 90, 99)
+
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    summary = {
+        "n": int(samples.size),
+        "mean": float(samples.mean()),
+        "min": float(samples.min()),
+        "max": float(samples.max()),
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = float(np.percentile(samples, percentile))
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+def peak_memory_kb(func: Callable[[], Any]) -> float:
+    """Peak Python heap allocated while running func once"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def measure(
+    stage: str,
+    size: int,
+    calls: List[Callable[[], Any]],
+    memory_call: Optional[Callable[[], Any]] = None
+) -> Dict[str, Any]:
+    """
+    Time each call once (after one warm-up call) and record peak memory
+
+    Args:
+        stage: Stage name
+        size: Document size in words
+        calls: One zero-argument callable per sample
+        memory_call: Call used for the traced memory run (defaults to calls[0])
+
+    Returns:
+        Result record
+    """
+    calls[0]()
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    print(f"  {stage:<16} {size:>6}w  p50 {np.percentile(samples, 50):9.3f} ms", file=sys.stderr)
+    return {
+        "stage": stage,
+        "size_words": size,
+        "latency_ms": summarize(samples),
+        "peak_memory_kb": peak_memory_kb(memory_call or calls[0]),
+    }
+
+
+def configure_environment(llm_latency_ms: float):
+    """Point every service at local stubs before the backend is imported"""
+    os.environ["OPENAI_BASE_URL"] = start_stub_llm(llm_latency_ms)
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["EMBEDDING_CACHE_ITEMS"] = "0"
+    os.environ["CANDIDATE_INDEX_DIR"] = tempfile.mkdtemp(prefix="bench-candidates-")
+
+
+def run(sizes: List[int], iterations: int, real_embeddings: bool, llm_latency_ms: float) -> List[Dict[str, Any]]:
+    """Run every stage for every document size"""
+    configure_environment(llm_latency_ms)
+
+    import embeddings
+    from embeddings import EmbeddingService
+    from pdf_extractor import extract_text
+    from rag import DocumentChunker, VectorStore
+
+    if not real_embeddings:
+        embeddings._embedding_service = EmbeddingService("hash-stub", model=HashEmbeddingModel())
+    embedding_service = embeddings.get_embedding_service()
+
+    import main
+    from fastapi.testclient import TestClient
+    from uploads import PdfUpload
+
+    # Distinct documents per sample so content-hash caches never hit
+    corpus = build_corpus(sizes, iterations)
+    chunker = DocumentChunker()
+    loop = asyncio.new_event_loop()
+    results = []
+
+    with TestClient(main.app) as client, redirect_stdout(io.StringIO()):
+        for size in sizes:
+            pdfs = corpus[size]
+            texts = [extract_text(pdf) for pdf in pdfs]
+            cleaned = [chunker.clean_text(text) for text in texts]
+            chunk_lists = [chunker.chunk_text(text) for text in cleaned]
+
+            results.append(measure(
+                "pdf_extract", size,
+                [lambda pdf=pdf: loop.run_until_complete(main.extract_text_from_pdf(PdfUpload.from_bytes(pdf))) for pdf in pdfs],
+                # Extraction runs in a worker process, so trace the in-process equivalent
+                memory_call=lambda: extract_text(pdfs[0])
+            ))
+            results.append(measure(
+                "clean_text", size,
+                [lambda text=text: chunker.clean_text(text) for text in texts]
+            ))
+            results.append(measure(
+                "chunk_text", size,
+                [lambda text=text: chunker.chunk_text(text) for text in cleaned]
+            ))
+            results.append(measure(
+                "embed_documents", size,
+                [lambda chunks=chunks: embedding_service.embed_documents(chunks) for chunks in chunk_lists]
+            ))
+
+            def add(chunks):
+                store = VectorStore()
+                store.add_documents(chunks)
+                return store
+
+            results.append(measure(
+                "vector_add", size,
+                [lambda chunks=chunks: add(chunks) for chunks in chunk_lists]
+            ))
+            stores = [add(chunks) for chunks in chunk_lists]
+            results.append(measure(
+                "vector_search", size,
+                [lambda store=store: store.search(JOB_DESCRIPTION, k=5) for store in stores]
+            ))
+
+            def analyze(pdf):
+                response = client.post(
+                    "/analyze",
+                    files={"resume": ("resume.pdf", pdf, "application/pdf")},
+                    data={"job_description": JOB_DESCRIPTION, "use_cache": "false"}
+                )
+                response.raise_for_status()
+
+            # Fresh documents so the PDF text cache misses on every sample
+            fresh = build_corpus([size], iterations, seed=7919)[size]
+            results.append(measure(
+                "analyze", size,
+                [lambda pdf=pdf: analyze(pdf) for pdf in fresh]
+            ))
+
+    loop.close()
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """
+    Compare p50 latencies with a previous run
+
+    Args:
+        results: Current results
+        baseline_path: JSON file written by a previous run
+        threshold: Ratio above which a stage counts as a regression
+
+    Returns:
+        Descriptions of regressed stages
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {
+            (record["stage"], record["size_words"]): record
+            for record in json.load(f)["results"]
+        }
+
+    regressions = []
+    print(f"\n{'stage':<16} {'size':>6} {'base p50':>10} {'p50':>10} {'ratio':>7}")
+    for record in results:
+        previous = baseline.get((record["stage"], record["size_words"]))
+        if previous is None:
+            continue
+        before = previous["latency_ms"]["p50"]
+        after = record["latency_ms"]["p50"]
+        ratio = after / before if before else float("inf")
+        flag = " REGRESSION" if ratio > threshold else ""
+        print(f"{record['stage']:<16} {record['size_words']:>6} {before:>10.3f} {after:>10.3f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(f"{record['stage']} @ {record['size_words']} words: {ratio:.2f}x")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks")
+    parser.add_argument("--sizes", default="300,1200,5000", help="Comma-separated document sizes in words")
+    parser.add_argument("--iterations", type=int, default=20, help="Samples per stage and size")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Previous results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio reported as a regression")
+    parser.add_argument("--llm-latency-ms", type=float, default=50, help="Stub LLM latency")
+    parser.add_argument("--real-embeddings", action="store_true", help="Use EMBEDDING_MODEL instead of the hash stub")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.iterations, args.real_embeddings, args.llm_latency_ms)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sizes,
+            "iterations": args.iterations,
+            "embeddings": "real" if args.real_embeddings else "hash-stub",
+            "llm_latency_ms": args.llm_latency_ms,
+            # ru_maxrss is reported in kilobytes on Linux
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Offline stand-ins for the embedding model and the OpenAI API
+"""
+import os
+import time
+import socket
+import hashlib
+import threading
+from typing import List, Union
+import numpy as np
+
+
+class HashEmbeddingModel:
+    """Deterministic bag-of-words hashing encoder
+
+    Implements the parts of the SentenceTransformer interface used by
+    EmbeddingService, so the pipeline can be timed without downloading a
+    model. Similar texts share tokens and therefore get similar vectors.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                vectors[row, int.from_bytes(digest, "little") % self.dimension] += 1.0
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.maximum(norms, 1e-12)
+        return vectors[0] if single else vectors
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_llm(latency_ms: float = 200) -> str:
+    """
+    Serve stub_openai in a background thread
+
+    Args:
+        latency_ms: Simulated completion latency
+
+    Returns:
+        Base URL to use as OPENAI_BASE_URL
+    """
+    import uvicorn
+
+    # stub_openai reads its settings at import time
+    os.environ["STUB_LATENCY_MS"] = str(latency_ms)
+    import stub_openai
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(stub_openai.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("Stub LLM server did not start")
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{port}/v1"
@@ -0,0 +1,333 @@
+"""
+Caching primitives: in-memory LRU, size-bounded sqlite store and a tiered cache
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class CacheStats:
+    """Hit/miss/eviction counters"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that hit"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Counters as a JSON-serializable dict"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4)
+        }
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by item count and total size"""
+
+    def __init__(
+        self,
+        max_items: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize LRU cache
+
+        Args:
+            max_items: Maximum number of entries
+            max_bytes: Maximum total size of entries (None for no limit)
+            ttl_seconds: Entries older than this are treated as misses
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._created: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached value or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.stats.misses += 1
+                return None
+            if self.ttl_seconds is not None and time.time() - self._created[key] > self.ttl_seconds:
+                self._remove(key)
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return self._entries[key]
+
+    def set(self, key: str, value: Any, size: int = 1):
+        """
+        Store a value, evicting least recently used entries as needed
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size: Size of the value in bytes (used for max_bytes)
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._created[key] = time.time()
+            self.current_bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_items
+                or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def _remove(self, key: str):
+        """Remove an entry (caller holds the lock)"""
+        del self._entries[key]
+        del self._created[key]
+        self.current_bytes -= self._sizes.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._created.clear()
+            self.current_bytes = 0
+
+
+class SqliteCache:
+    """Persistent key/value store bounded by total size, with optional TTL"""
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        """
+        Initialize sqlite-backed cache
+
+        Args:
+            path: Database file path
+            max_bytes: Maximum total size of stored values
+            ttl_seconds: Entries older than this are treated as misses
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+        self.current_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return stored bytes or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, created = row
+            if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                self._delete(key)
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes):
+        """Store bytes, evicting least recently accessed entries as needed"""
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                row = self._conn.execute(
+                    "SELECT key FROM entries ORDER BY accessed LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._delete(row[0])
+                self.stats.evictions += 1
+
+    def _delete(self, key: str):
+        """Delete a key (caller holds the lock)"""
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.current_bytes -= row[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional sqlite tier
+
+    Coroutines use aget/aset, which touch the disk tier in the event loop's
+    default executor so a slow disk never blocks other requests.
+    """
+
+    def __init__(
+        self,
+        memory: LRUCache,
+        disk: Optional[SqliteCache] = None,
+        encode: Callable[[Any], bytes] = lambda value: value,
+        decode: Callable[[bytes], Any] = lambda data: data,
+        sizeof: Callable[[Any], int] = len
+    ):
+        """
+        Initialize tiered cache
+
+        Args:
+            memory: In-memory tier
+            disk: Optional persistent tier
+            encode: Converts a value to bytes for the disk tier
+            decode: Converts bytes from the disk tier back to a value
+            sizeof: Size of a value in bytes for the memory tier
+        """
+        self.memory = memory
+        self.disk = disk
+        self.encode = encode
+        self.decode = decode
+        self.sizeof = sizeof
+        self.stats = CacheStats()
+        # Updated from the event loop and from worker threads
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached value from the fastest tier that has it"""
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self._load(key)
+        return self._count(value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() for coroutines: a memory miss is read from disk in a thread"""
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = await asyncio.get_running_loop().run_in_executor(None, self._load, key)
+        return self._count(value)
+
+    def set(self, key: str, value: Any):
+        """Store a value in all tiers"""
+        self.memory.set(key, value, self.sizeof(value))
+        if self.disk is not None:
+            self.disk.set(key, self.encode(value))
+
+    async def aset(self, key: str, value: Any):
+        """set() for coroutines: the disk tier is written in a thread"""
+        self.memory.set(key, value, self.sizeof(value))
+        if self.disk is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._store, key, value)
+
+    def _load(self, key: str) -> Optional[Any]:
+        """Read a value from the disk tier and promote it to memory"""
+        data = self.disk.get(key)
+        if data is None:
+            return None
+        value = self.decode(data)
+        self.memory.set(key, value, self.sizeof(value))
+        return value
+
+    def _store(self, key: str, value: Any):
+        self.disk.set(key, self.encode(value))
+
+    def _count(self, value: Optional[Any]) -> Optional[Any]:
+        """Record a lookup outcome and pass the value through"""
+        with self._stats_lock:
+            if value is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return value
+
+    def stats_dict(self) -> Dict[str, Any]:
+        """Overall and per-tier counters"""
+        stats = self.stats.as_dict()
+        stats["memory"] = self.memory.stats.as_dict()
+        stats["memory"]["entries"] = len(self.memory)
+        stats["memory"]["bytes"] = self.memory.current_bytes
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats.as_dict()
+            stats["disk"]["bytes"] = self.disk.current_bytes
+        return stats
+
+
+# Global instance
+_text_cache = None
+
+
+def get_text_cache() -> TieredCache:
+    """Get or create global cache of extracted PDF text keyed by content hash"""
+    global _text_cache
+    if _text_cache is None:
+        memory = LRUCache(
+            max_items=int(os.getenv("PDF_TEXT_CACHE_ITEMS", "2048")),
+            max_bytes=int(os.getenv("PDF_TEXT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
+        disk_path = os.getenv("PDF_TEXT_CACHE_PATH")
+        disk = None
+        if disk_path:
+            disk = SqliteCache(
+                disk_path,
+                max_bytes=int(os.getenv("PDF_TEXT_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+            )
+        _text_cache = TieredCache(
+            memory,
+            disk,
+            encode=lambda text: text.encode("utf-8"),
+            decode=lambda data: data.decode("utf-8"),
+            sizeof=lambda text: len(text.encode("utf-8"))
+        )
+    return _text_cache
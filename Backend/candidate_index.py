@@ -0,0 +1,249 @@
+"""
+Persistent on-disk candidate index for ranking a resume corpus against a JD
+"""
+import os
+import json
+import uuid
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from embeddings import get_embedding_service
+from lazy_imports import lazy_module
+
+faiss = lazy_module("faiss")
+
+
+class CandidateIndex:
+    """Append-only FAISS index of resume chunk embeddings with a metadata sidecar
+
+    Vectors are L2-normalized so inner-product scores are cosine similarities.
+    Line i of the metadata sidecar describes vector i of the index.
+    """
+
+    INDEX_FILE = "candidates.faiss"
+    METADATA_FILE = "candidates.meta.jsonl"
+
+    def __init__(
+        self,
+        dimension: int,
+        index_dir: str = "storage/candidates",
+        index_type: str = "flat",
+        ivf_nlist: int = 256,
+        ivf_nprobe: int = 16,
+        hnsw_m: int = 32
+    ):
+        """
+        Initialize candidate index and load it from disk if present
+
+        Args:
+            dimension: Embedding dimension
+            index_dir: Directory holding the index and metadata sidecar
+            index_type: "flat", "hnsw" or "ivf"
+            ivf_nlist: Number of IVF lists (IVF is built once enough vectors exist)
+            ivf_nprobe: Number of IVF lists visited per search
+            hnsw_m: Graph degree for HNSW
+        """
+        if index_type not in ("flat", "hnsw", "ivf"):
+            raise ValueError(f"Unknown candidate index type: {index_type}")
+
+        self.dimension = dimension
+        self.index_dir = index_dir
+        self.index_type = index_type
+        self.ivf_nlist = ivf_nlist
+        self.ivf_nprobe = ivf_nprobe
+        self.hnsw_m = hnsw_m
+        self.index_path = os.path.join(index_dir, self.INDEX_FILE)
+        self.metadata_path = os.path.join(index_dir, self.METADATA_FILE)
+        self.metadata: List[Dict[str, Any]] = []
+        self.candidates: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(index_dir, exist_ok=True)
+        self.index = self._load() if os.path.exists(self.index_path) else self._new_index()
+
+    def _new_index(self) -> "faiss.Index":
+        """Create an empty index of the configured type"""
+        if self.index_type == "hnsw":
+            return faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        # IVF needs training data, so it starts flat and is rebuilt once large enough
+        return faiss.IndexFlatIP(self.dimension)
+
+    def _load(self) -> "faiss.Index":
+        """Load index (memory-mapped where supported) and metadata sidecar"""
+        try:
+            index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP)
+        except RuntimeError:
+            index = faiss.read_index(self.index_path)
+        # Memory-mapped IVF lists are read-only, and this index is appended to
+        if isinstance(index, faiss.IndexIVF):
+            index = faiss.read_index(self.index_path)
+
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, "r", encoding="utf-8") as f:
+                self.metadata = [json.loads(line) for line in f if line.strip()]
+
+        # A crash between the two writes can leave extra metadata lines behind
+        if len(self.metadata) > index.ntotal:
+            self.metadata = self.metadata[:index.ntotal]
+            with open(self.metadata_path, "w", encoding="utf-8") as f:
+                for entry in self.metadata:
+                    f.write(json.dumps(entry) + "\n")
+        for entry in self.metadata:
+            self.candidates[entry["candidate_id"]] = entry["name"]
+
+        self._configure(index)
+        print(f"Candidate index loaded: {len(self.candidates)} candidates, {index.ntotal} vectors")
+        return index
+
+    def _configure(self, index: "faiss.Index"):
+        """Apply search-time parameters"""
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.ivf_nprobe
+
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        vectors = np.array(embeddings, dtype="float32", copy=True).reshape(-1, embeddings.shape[-1])
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def _maybe_build_ivf(self):
+        """Rebuild a flat index as IVF once enough vectors exist to train it"""
+        if self.index_type != "ivf" or isinstance(self.index, faiss.IndexIVF):
+            return
+        if self.index.ntotal < self.ivf_nlist * 39:
+            return
+
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        index = faiss.IndexIVFFlat(quantizer, self.dimension, self.ivf_nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.add(vectors)
+        self._configure(index)
+        self.index = index
+        print(f"Candidate index rebuilt as IVF with {self.ivf_nlist} lists")
+
+    def add_candidate(
+        self,
+        name: str,
+        chunks: List[str],
+        embeddings: np.ndarray,
+        save: bool = True
+    ) -> str:
+        """
+        Append a candidate's resume chunks to the index
+
+        Args:
+            name: Display name (usually the file name)
+            chunks: Resume chunks
+            embeddings: Embeddings aligned with chunks
+            save: Write the index to disk after appending
+
+        Returns:
+            New candidate ID
+        """
+        if not chunks or embeddings.size == 0:
+            raise ValueError("Candidate has no content to index")
+
+        candidate_id = uuid.uuid4().hex
+        vectors = self._normalize(embeddings)
+        entries = [
+            {"candidate_id": candidate_id, "name": name, "chunk": chunk}
+            for chunk in chunks
+        ]
+
+        with self._lock:
+            self.index.add(vectors)
+            self.metadata.extend(entries)
+            self.candidates[candidate_id] = name
+            with open(self.metadata_path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            self._maybe_build_ivf()
+            if save:
+                self.save()
+
+        return candidate_id
+
+    def save(self):
+        """Atomically write the index to disk"""
+        with self._lock:
+            tmp_path = self.index_path + ".tmp"
+            faiss.write_index(self.index, tmp_path)
+            os.replace(tmp_path, self.index_path)
+
+    def rank(self, query_embedding: np.ndarray, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank candidates by their best-matching chunk
+
+        Args:
+            query_embedding: Job description embedding
+            top_k: Number of candidates to return
+
+        Returns:
+            List of dicts with candidate_id, name, score and best_chunk
+        """
+        with self._lock:
+            if self.index.ntotal == 0:
+                return []
+
+            query = self._normalize(query_embedding)
+            # Over-fetch chunks since several can belong to the same candidate,
+            # widening the search until top_k candidates are found or all chunks are seen
+            k = min(self.index.ntotal, max(top_k * 8, 32))
+            while True:
+                scores, indices = self.index.search(query, k)
+                ranked = self._best_per_candidate(scores[0], indices[0], top_k)
+                if len(ranked) >= top_k or k >= self.index.ntotal:
+                    break
+                k = min(self.index.ntotal, k * 2)
+
+        return list(ranked.values())
+
+    def _best_per_candidate(self, scores: np.ndarray, indices: np.ndarray, top_k: int) -> Dict[str, Dict[str, Any]]:
+        """Keep the highest-scoring chunk of each candidate, up to top_k candidates"""
+        ranked: Dict[str, Dict[str, Any]] = {}
+        for score, idx in zip(scores, indices):
+            if idx < 0 or idx >= len(self.metadata):
+                continue
+            entry = self.metadata[idx]
+            candidate_id = entry["candidate_id"]
+            if candidate_id not in ranked:
+                ranked[candidate_id] = {
+                    "candidate_id": candidate_id,
+                    "name": entry["name"],
+                    "score": round(float(score), 4),
+                    "best_chunk": entry["chunk"]
+                }
+            if len(ranked) >= top_k:
+                break
+        return ranked
+
+    @property
+    def total_candidates(self) -> int:
+        """Number of indexed candidates"""
+        return len(self.candidates)
+
+
+# Global instance
+_candidate_index = None
+_candidate_index_lock = threading.Lock()
+
+
+def get_candidate_index(dimension: Optional[int] = None) -> CandidateIndex:
+    """Get or create global candidate index"""
+    global _candidate_index
+    if _candidate_index is None:
+        # Two instances over one directory would overwrite each other's appends
+        with _candidate_index_lock:
+            if _candidate_index is None:
+                if dimension is None:
+                    dimension = get_embedding_service().embedding_dim
+                _candidate_index = CandidateIndex(
+                    dimension=dimension,
+                    index_dir=os.getenv("CANDIDATE_INDEX_DIR", "storage/candidates"),
+                    index_type=os.getenv("CANDIDATE_INDEX_TYPE", "flat"),
+                    ivf_nlist=int(os.getenv("CANDIDATE_IVF_NLIST", "256")),
+                    ivf_nprobe=int(os.getenv("CANDIDATE_IVF_NPROBE", "16")),
+                    hnsw_m=int(os.getenv("CANDIDATE_HNSW_M", "32"))
+                )
+    return _candidate_index
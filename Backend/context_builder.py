@@ -0,0 +1,185 @@
+"""
+Token-budgeted prompt context for the LLM
+
+Counts tokens with the tokenizer of the configured model (tiktoken when it is
+installed, a character estimate otherwise), drops retrieved chunks that repeat
+text already in the prompt and packs the best-ranked chunks into a budget.
+"""
+import os
+import re
+from typing import List, Set, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_WORD_RE = re.compile(r"\w+")
+
+# Average characters per token for English text when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """Counts and truncates text in model tokens"""
+
+    def __init__(self, model: str = "gpt-3.5-turbo"):
+        """
+        Initialize tokenizer
+
+        Args:
+            model: OpenAI model name used to pick the encoding
+        """
+        self.model = model
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cut text to at most max_tokens tokens
+
+        Args:
+            text: Input text
+            max_tokens: Token budget
+
+        Returns:
+            Prefix of text within the budget
+        """
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens])
+        return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    """Word n-grams used to measure overlap between passages"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class ContextBuilder:
+    """Packs a resume and its retrieved chunks into token budgets
+
+    The resume head (contact details, summary) is always kept. Retrieved
+    chunks are then added in rank order, skipping any chunk whose word
+    3-grams are mostly present in the text already packed, until the budget
+    is spent. Leftover budget extends the resume head.
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        resume_budget: int = 1000,
+        job_description_budget: int = 500,
+        head_tokens: int = 200,
+        overlap_threshold: float = 0.5
+    ):
+        """
+        Initialize builder
+
+        Args:
+            counter: Token counter for the target model
+            resume_budget: Tokens available for resume text
+            job_description_budget: Tokens available for the job description
+            head_tokens: Tokens of the resume head that are always included
+            overlap_threshold: Fraction of a chunk's 3-grams already packed
+                above which the chunk is dropped as a duplicate
+        """
+        self.counter = counter
+        self.resume_budget = resume_budget
+        self.job_description_budget = job_description_budget
+        self.head_tokens = head_tokens
+        self.overlap_threshold = overlap_threshold
+
+    def _is_duplicate(self, chunk_shingles: Set[Tuple[str, ...]], seen: Set[Tuple[str, ...]]) -> bool:
+        if not chunk_shingles:
+            return True
+        overlap = len(chunk_shingles & seen) / len(chunk_shingles)
+        return overlap >= self.overlap_threshold
+
+    def build_resume_context(self, resume_text: str, ranked_chunks: List[str]) -> str:
+        """
+        Build the resume part of the prompt
+
+        Args:
+            resume_text: Cleaned resume text
+            ranked_chunks: Retrieved chunks, most relevant first
+
+        Returns:
+            Resume context within the resume token budget
+        """
+        budget = self.resume_budget
+        if self.counter.count(resume_text) <= budget:
+            # Every retrieved chunk is a piece of the resume already sent
+            return resume_text
+
+        head = self.counter.truncate(resume_text, min(self.head_tokens, budget))
+        seen = _shingles(head)
+        used = self.counter.count(head)
+
+        selected: List[str] = []
+        for chunk in ranked_chunks:
+            chunk_shingles = _shingles(chunk)
+            if self._is_duplicate(chunk_shingles, seen):
+                continue
+            cost = self.counter.count("\n\n" + chunk)
+            if used + cost > budget:
+                continue
+            selected.append(chunk)
+            seen |= chunk_shingles
+            used += cost
+
+        # Spend what is left on more of the resume in reading order
+        if used < budget:
+            head = self.counter.truncate(resume_text, self.counter.count(head) + budget - used)
+            head_shingles = _shingles(head)
+            selected = [
+                chunk for chunk in selected
+                if not self._is_duplicate(_shingles(chunk), head_shingles)
+            ]
+
+        return "\n\n".join([head] + selected)
+
+    def truncate_job_description(self, job_description: str) -> str:
+        """Cut the job description to its token budget"""
+        return self.counter.truncate(job_description, self.job_description_budget)
+
+    def truncate_resume(self, resume_text: str) -> str:
+        """Cut resume text that did not go through build_resume_context"""
+        return self.counter.truncate(resume_text, self.resume_budget)
+
+
+# Global instance
+_context_builder = None
+
+
+def get_context_builder() -> ContextBuilder:
+    """Get or create global context builder"""
+    global _context_builder
+    if _context_builder is None:
+        _context_builder = ContextBuilder(
+            TokenCounter(os.getenv("LLM_MODEL", "gpt-3.5-turbo")),
+            resume_budget=int(os.getenv("LLM_RESUME_TOKEN_BUDGET", "1000")),
+            job_description_budget=int(os.getenv("LLM_JD_TOKEN_BUDGET", "500")),
+            head_tokens=int(os.getenv("LLM_RESUME_HEAD_TOKENS", "200")),
+            overlap_threshold=float(os.getenv("LLM_CONTEXT_OVERLAP_THRESHOLD", "0.5"))
+        )
+    return _context_builder
@@ -0,0 +1,287 @@
+"""
+CPU embedding backends
+
+Every backend implements the part of the SentenceTransformer interface used by
+EmbeddingService (encode and get_sentence_embedding_dimension):
+
+- torch: sentence-transformers running PyTorch
+- onnx: the same transformer exported to ONNX, run with ONNX Runtime
+- onnx-int8: the ONNX export with dynamically quantized int8 weights
+
+The ONNX backends load from a local model directory prepared once with
+
+    python embedding_backends.py export sentence-transformers/all-MiniLM-L6-v2 models/minilm
+
+which saves the sentence-transformers model (tokenizer and configs) next to
+model.onnx and model_int8.onnx. Check that the exports agree with PyTorch with
+
+    python embedding_backends.py parity models/minilm
+"""
+import os
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from lazy_imports import lazy_module
+
+sentence_transformers = lazy_module("sentence_transformers")
+onnxruntime = lazy_module("onnxruntime")
+tokenizers = lazy_module("tokenizers")
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_FILES = {"onnx": "model.onnx", "onnx-int8": "model_int8.onnx"}
+
+# Minimum cosine similarity to the PyTorch embedding of the same text
+PARITY_THRESHOLDS = {"onnx": 0.999, "onnx-int8": 0.97}
+
+PARITY_TEXTS = [
+    "Senior Python developer with eight years of experience building REST APIs.",
+    "Designed and deployed microservices on AWS using Docker and Kubernetes.",
+    "Led a team of five engineers delivering a React and TypeScript dashboard.",
+    "Machine learning engineer: PyTorch, scikit-learn, feature pipelines, MLOps.",
+    "Managed PostgreSQL and Redis clusters; reduced query latency by 40%.",
+    "Bachelor of Science in Computer Science, University of Washington, 2016.",
+    "Certifications: AWS Solutions Architect Associate, Certified Scrum Master.",
+    "We are hiring a backend engineer familiar with FastAPI, CI/CD and Terraform.",
+    "Skills",
+    "Volunteer math tutor for high school students on weekends.",
+]
+
+
+class OnnxEmbeddingModel:
+    """Sentence-transformers model exported to ONNX
+
+    Runs the transformer with ONNX Runtime and applies the mean pooling and
+    L2 normalization that all-MiniLM-L6-v2 uses, so vectors are comparable to
+    the PyTorch backend. Only onnxruntime and tokenizers are imported.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0):
+        """
+        Load an exported model
+
+        Args:
+            model_dir: Directory written by export_onnx
+            quantized: Load the int8 model instead of the float32 one
+            threads: ONNX Runtime intra-op threads (0 = one per core)
+        """
+        path = os.path.join(model_dir, ONNX_FILES["onnx-int8" if quantized else "onnx"])
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"{path} not found; create it with: python embedding_backends.py export <model> {model_dir}"
+            )
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        self.max_seq_length = _read_json(model_dir, "sentence_bert_config.json").get("max_seq_length", 256)
+        self.dimension = _read_json(model_dir, "config.json")["hidden_size"]
+        modules = _read_json(model_dir, "modules.json")
+        self.normalize = any(module.get("type", "").endswith("Normalize") for module in modules or [])
+
+        self.tokenizer = tokenizers.Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        # Longest first so each batch pads to similar lengths
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            embeddings[batch] = self._encode_batch([texts[i] for i in batch])
+
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Tokenize, run the transformer and mean-pool one batch"""
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+        }
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if self.normalize:
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled
+
+
+def _read_json(model_dir: str, filename: str) -> Any:
+    """Read a config file from a model directory ({} when missing)"""
+    path = os.path.join(model_dir, filename)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_backend(backend: str, model_name: str, model_dir: Optional[str] = None, threads: int = 0):
+    """
+    Load an embedding model
+
+    Args:
+        backend: One of BACKENDS
+        model_name: HuggingFace model name (used by torch when model_dir is unset)
+        model_dir: Local model directory (required for the ONNX backends)
+        threads: Intra-op threads for ONNX Runtime (0 = one per core)
+
+    Returns:
+        Encoder with the SentenceTransformer interface
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+    print(f"Loading embedding model: {model_dir or model_name} ({backend})")
+    if backend == "torch":
+        return sentence_transformers.SentenceTransformer(model_dir or model_name, device="cpu")
+
+    if not model_dir:
+        raise ValueError(f"EMBEDDING_MODEL_DIR is required for the {backend} backend")
+    return OnnxEmbeddingModel(model_dir, quantized=backend == "onnx-int8", threads=threads)
+
+
+def export_onnx(model_name: str, output_dir: str, opset: int = 14) -> Dict[str, str]:
+    """
+    Save a sentence-transformers model with float32 and int8 ONNX exports
+
+    Args:
+        model_name: HuggingFace model name or local path
+        output_dir: Directory to write
+        opset: ONNX opset version
+
+    Returns:
+        Backend name to written ONNX file
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+    model.save(output_dir)
+    transformer = model[0].auto_model.eval()
+
+    sample = model.tokenizer(["export sample text"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class LastHiddenState(torch.nn.Module):
+        """Positional-argument wrapper returning only last_hidden_state"""
+
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, *inputs):
+            return self.inner(**dict(zip(input_names, inputs))).last_hidden_state
+
+    axes = {0: "batch", 1: "sequence"}
+    paths = {backend: os.path.join(output_dir, filename) for backend, filename in ONNX_FILES.items()}
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer),
+            tuple(sample[name] for name in input_names),
+            paths["onnx"],
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: axes for name in input_names + ["last_hidden_state"]},
+            opset_version=opset
+        )
+
+    # Dynamic quantization: int8 weights, activations quantized per batch at run time
+    quantize_dynamic(paths["onnx"], paths["onnx-int8"], weight_type=QuantType.QInt8)
+    return paths
+
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """
+    Row-wise cosine similarity between two embedding matrices
+
+    Args:
+        reference: Embeddings from the reference backend
+        candidate: Embeddings of the same texts from another backend
+
+    Returns:
+        Minimum and mean cosine similarity
+    """
+    reference = reference / np.maximum(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12)
+    candidate = candidate / np.maximum(np.linalg.norm(candidate, axis=1, keepdims=True), 1e-12)
+    cosine = (reference * candidate).sum(axis=1)
+    return {"min_cosine": float(cosine.min()), "mean_cosine": float(cosine.mean())}
+
+
+def check_parity(model_dir: str, texts: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare the ONNX backends with PyTorch on the same texts
+
+    Args:
+        model_dir: Directory written by export_onnx
+        texts: Texts to embed (defaults to PARITY_TEXTS)
+
+    Returns:
+        Per-backend cosine statistics and whether they pass PARITY_THRESHOLDS
+    """
+    texts = texts or PARITY_TEXTS
+    reference = load_backend("torch", model_dir, model_dir).encode(texts, convert_to_numpy=True)
+
+    report = {}
+    for backend, threshold in PARITY_THRESHOLDS.items():
+        embeddings = load_backend(backend, model_dir, model_dir).encode(texts)
+        stats = cosine_parity(reference, embeddings)
+        report[backend] = {**stats, "threshold": threshold, "passed": stats["min_cosine"] >= threshold}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare and verify ONNX embedding backends")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Save a model with float32 and int8 ONNX exports")
+    export.add_argument("model", help="HuggingFace model name, e.g. sentence-transformers/all-MiniLM-L6-v2")
+    export.add_argument("output_dir", help="Local model directory to create")
+    export.add_argument("--opset", type=int, default=14)
+
+    parity = commands.add_parser("parity", help="Compare ONNX embeddings with PyTorch")
+    parity.add_argument("model_dir", help="Directory written by export")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        for backend, path in export_onnx(args.model, args.output_dir, args.opset).items():
+            print(f"{backend}: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+        return
+
+    report = check_parity(args.model_dir)
+    for backend, stats in report.items():
+        status = "ok" if stats["passed"] else "FAILED"
+        print(
+            f"{backend:<10} min cosine {stats['min_cosine']:.5f}  "
+            f"mean {stats['mean_cosine']:.5f}  (>= {stats['threshold']}) {status}"
+        )
+    if not all(stats["passed"] for stats in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
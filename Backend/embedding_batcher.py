@@ -0,0 +1,201 @@
+"""
+Micro-batching of embedding calls across concurrent requests
+
+Each request embeds a handful of chunks plus one job description, so with
+many requests in flight the encoder spends most of its time on per-call
+overhead. EmbeddingBatcher queues the texts of concurrent encode calls and
+runs them as one forward pass. A batch is flushed as soon as no other caller
+could join it (an uncontended call never waits), when it is full, when it
+holds one call from every possible caller, or when the oldest call has
+waited max_wait_ms.
+"""
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, List, Optional, Union
+import numpy as np
+from metrics import EMBEDDING_BATCH_CALLS, EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WAIT_SECONDS
+
+
+class _PendingCall:
+    """Texts of one encode call waiting to be batched"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class EmbeddingBatcher:
+    """Encoder wrapper that merges concurrent encode calls into batches
+
+    Implements the same encode / get_sentence_embedding_dimension interface
+    as the wrapped model, so EmbeddingService uses it unchanged. Callers
+    block on their own future while dispatcher threads run the batches.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        concurrency: int = 1,
+        max_callers: Optional[int] = None
+    ):
+        """
+        Initialize batcher (dispatcher threads start on first use)
+
+        Args:
+            model: Encoder with the SentenceTransformer interface
+            max_batch_size: Texts per batch; calls this large skip the queue
+            max_wait_ms: Longest a call waits for others to join its batch
+            concurrency: Batches encoded at once (e.g. one per worker process)
+            max_callers: Threads that can call encode at once (e.g. the size
+                of the pool running embeddings); a batch holding a call from
+                each of them is flushed without waiting
+        """
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.concurrency = max(1, concurrency)
+        self.max_callers = max(1, max_callers) if max_callers else None
+        # Callers inside encode, and those whose batch is being encoded
+        self._active = 0
+        self._serving = 0
+        self._queue: "queue.Queue[Optional[_PendingCall]]" = queue.Queue()
+        self._dispatchers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        if not texts:
+            embeddings = np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        elif len(texts) >= self.max_batch_size:
+            # Already a full batch: nothing to gain from waiting for others
+            embeddings = self._encode(texts, batch_size, calls=1)
+        else:
+            call = _PendingCall(texts)
+            self._ensure_dispatcher()
+            with self._lock:
+                self._active += 1
+            try:
+                self._queue.put(call)
+                embeddings = call.future.result()
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        return embeddings[0] if single else embeddings
+
+    def _encode(self, texts: List[str], batch_size: int, calls: int) -> np.ndarray:
+        """Run one forward pass and record its size"""
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        EMBEDDING_BATCH_CALLS.observe(calls)
+        return np.asarray(
+            self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True),
+            dtype=np.float32
+        )
+
+    def _ensure_dispatcher(self):
+        """Start the dispatcher threads if they are not running"""
+        if not self._dispatchers:
+            with self._lock:
+                if not self._dispatchers:
+                    for index in range(self.concurrency):
+                        dispatcher = threading.Thread(
+                            target=self._dispatch, name=f"embedding-batcher-{index}", daemon=True
+                        )
+                        dispatcher.start()
+                        self._dispatchers.append(dispatcher)
+
+    def _dispatch(self):
+        """Collect queued calls into batches until close() is called"""
+        carried: Optional[_PendingCall] = None
+        while True:
+            first = carried or self._queue.get()
+            carried = None
+            if first is None:
+                return
+
+            batch = [first]
+            size = len(first.texts)
+            deadline = first.enqueued + self.max_wait
+            stop = False
+            while size < self.max_batch_size and (self.max_callers is None or len(batch) < self.max_callers):
+                try:
+                    call = self._queue.get_nowait()
+                except queue.Empty:
+                    timeout = deadline - time.perf_counter()
+                    # Only wait while another caller could still join this batch
+                    if timeout <= 0 or not self._others_active(len(batch)):
+                        break
+                    try:
+                        call = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                if call is None:
+                    stop = True
+                    break
+                if size + len(call.texts) > self.max_batch_size:
+                    # Starts the next batch instead of overflowing this one
+                    carried = call
+                    break
+                batch.append(call)
+                size += len(call.texts)
+
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _others_active(self, collected: int) -> bool:
+        """Whether a caller outside the collected calls and running batches is in encode"""
+        return self._active - self._serving - collected > 0
+
+    def _run_batch(self, batch: List[_PendingCall]):
+        """Encode the texts of several calls at once and resolve their futures"""
+        started = time.perf_counter()
+        for call in batch:
+            EMBEDDING_BATCH_WAIT_SECONDS.observe(started - call.enqueued)
+
+        with self._lock:
+            self._serving += len(batch)
+        try:
+            texts = [text for call in batch for text in call.texts]
+            try:
+                embeddings = self._encode(texts, self.max_batch_size, calls=len(batch))
+            except Exception as e:
+                for call in batch:
+                    call.future.set_exception(e)
+                return
+
+            offset = 0
+            for call in batch:
+                call.future.set_result(embeddings[offset:offset + len(call.texts)])
+                offset += len(call.texts)
+        finally:
+            with self._lock:
+                self._serving -= len(batch)
+
+    def close(self):
+        """Stop the dispatchers after the queued calls have been served, then the model"""
+        with self._lock:
+            for _ in self._dispatchers:
+                self._queue.put(None)
+            for dispatcher in self._dispatchers:
+                dispatcher.join()
+            self._dispatchers = []
+        if hasattr(self.model, "close"):
+            self.model.close()
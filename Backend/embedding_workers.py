@@ -0,0 +1,284 @@
+"""
+Out-of-process embedding workers
+
+The embedding model runs in a pool of worker processes, each limited to a
+fixed number of compute threads, instead of inside every web worker. Texts
+are sent to a worker and the embedding matrix comes back through a shared
+memory segment allocated by the caller, so arrays are never pickled.
+
+Two modes share the same encoder interface:
+
+- EmbeddingWorkerPool: the web process owns a local pool (EMBEDDING_WORKERS)
+- RemoteEmbeddingPool: several web workers on one host share a pool started
+  separately (EMBEDDING_WORKERS_ADDRESS) with
+
+    EMBEDDING_WORKERS_AUTHKEY=... python embedding_workers.py --address 127.0.0.1:7300 --workers 2 --threads 4
+
+The manager exchanges pickles, so anyone holding the authkey can run code
+in the server: EMBEDDING_WORKERS_AUTHKEY must be set to a secret on both
+sides and there is no default.
+"""
+import os
+import abc
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import BaseManager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional, Tuple, Union
+import numpy as np
+from embedding_backends import BACKENDS, load_backend
+
+# Thread pools sized by these variables are created when torch/numpy are imported
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Model loaded in each worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(backend: str, model_name: str, model_dir: Optional[str], threads: int):
+    """Pin the worker's thread budget, then load the model"""
+    global _worker_model
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    # Tokenizer threads would compete with the model's
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if backend == "torch":
+        import torch
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    _worker_model = load_backend(backend, model_name, model_dir, threads=threads)
+
+
+def _worker_dimension() -> int:
+    """Embedding dimension of the worker's model"""
+    return _worker_model.get_sentence_embedding_dimension()
+
+
+def _worker_encode_into(shm_name: str, texts: List[str], batch_size: int, dimension: int):
+    """Encode texts in the worker and write them into the caller's segment"""
+    shm = SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray((len(texts), dimension), dtype=np.float32, buffer=shm.buf)
+        out[:] = _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        del out
+    finally:
+        shm.close()
+
+
+def require_authkey() -> str:
+    """
+    Shared secret of the remote pool, from EMBEDDING_WORKERS_AUTHKEY
+
+    Raises:
+        RuntimeError: If the variable is unset or empty
+    """
+    authkey = os.getenv("EMBEDDING_WORKERS_AUTHKEY")
+    if not authkey:
+        raise RuntimeError(
+            "EMBEDDING_WORKERS_AUTHKEY must be set when the embedding pool is served or used remotely"
+        )
+    return authkey
+
+
+class _SharedMemoryEncoder(abc.ABC):
+    """Encoder interface on top of a remote encode-into-segment call"""
+
+    _dimension: Optional[int] = None
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self._fetch_dimension()
+        return self._dimension
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        dimension = self.get_sentence_embedding_dimension()
+        if not texts:
+            return np.empty((0, dimension), dtype=np.float32)
+
+        shape = (len(texts), dimension)
+        shm = SharedMemory(create=True, size=shape[0] * shape[1] * 4)
+        try:
+            self.encode_into(shm.name, texts, batch_size, dimension)
+            # Copy out so the segment can be released right away
+            embeddings = np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return embeddings[0] if single else embeddings
+
+    @abc.abstractmethod
+    def _fetch_dimension(self) -> int:
+        """Ask the workers for the embedding dimension"""
+
+    @abc.abstractmethod
+    def encode_into(self, shm_name: str, texts: List[str], batch_size: int, dimension: int):
+        """Encode texts into the float32 (len(texts), dimension) segment shm_name"""
+
+
+class EmbeddingWorkerPool(_SharedMemoryEncoder):
+    """Embedding model served by a local pool of worker processes"""
+
+    def __init__(
+        self,
+        workers: int,
+        threads: int,
+        backend: str,
+        model_name: str,
+        model_dir: Optional[str] = None,
+        start_method: str = "spawn"
+    ):
+        """
+        Start the workers and load the model in each of them
+
+        Args:
+            workers: Worker processes
+            threads: Compute threads per worker
+            backend: One of embedding_backends.BACKENDS
+            model_name: HuggingFace model name
+            model_dir: Local model directory (required for ONNX backends)
+            start_method: multiprocessing start method
+        """
+        self.workers = max(1, workers)
+        self.threads = max(1, threads)
+        print(f"Starting {self.workers} embedding workers with {self.threads} threads each")
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(backend, model_name, model_dir, self.threads)
+        )
+        # Workers start on demand, so submit one task per worker to load them all now
+        dimensions = [self.pool.submit(_worker_dimension) for _ in range(self.workers)]
+        self._dimension = dimensions[0].result()
+        for future in dimensions[1:]:
+            future.result()
+
+    def _fetch_dimension(self) -> int:
+        return self.pool.submit(_worker_dimension).result()
+
+    def get_worker_count(self) -> int:
+        """Number of worker processes"""
+        return self.workers
+
+    def encode_into(self, shm_name: str, texts: List[str], batch_size: int, dimension: int):
+        self.pool.submit(_worker_encode_into, shm_name, texts, batch_size, dimension).result()
+
+    def close(self):
+        """Stop the worker processes"""
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _PoolManager(BaseManager):
+    """Exposes an EmbeddingWorkerPool to other processes on the host"""
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split "host:port" into a multiprocessing address"""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class RemoteEmbeddingPool(_SharedMemoryEncoder):
+    """Client of an embedding pool served by embedding_workers.py
+
+    Shared memory segments are passed by name, so the server must run on
+    the same host.
+    """
+
+    def __init__(self, address: str, authkey: str):
+        """
+        Connect to a running pool
+
+        Args:
+            address: "host:port" the pool listens on
+            authkey: Shared secret configured on the server
+        """
+        _PoolManager.register("pool")
+        self.manager = _PoolManager(address=parse_address(address), authkey=authkey.encode("utf-8"))
+        self.manager.connect()
+        self.pool = self.manager.pool()
+        self.workers = self.pool.get_worker_count()
+        print(f"Connected to {self.workers} embedding workers at {address}")
+
+    def _fetch_dimension(self) -> int:
+        return self.pool.get_sentence_embedding_dimension()
+
+    def encode_into(self, shm_name: str, texts: List[str], batch_size: int, dimension: int):
+        self.pool.encode_into(shm_name, texts, batch_size, dimension)
+
+
+def create_embedding_model(backend: str, model_name: str, model_dir: Optional[str]) -> Any:
+    """
+    Build the encoder selected by the EMBEDDING_WORKERS* settings
+
+    Args:
+        backend: One of embedding_backends.BACKENDS
+        model_name: HuggingFace model name
+        model_dir: Local model directory
+
+    Returns:
+        Remote pool client, local worker pool or in-process model
+    """
+    address = os.getenv("EMBEDDING_WORKERS_ADDRESS")
+    if address:
+        return RemoteEmbeddingPool(address, require_authkey())
+
+    threads = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+    workers = int(os.getenv("EMBEDDING_WORKERS", "0"))
+    if workers <= 0:
+        return load_backend(backend, model_name, model_dir, threads=threads)
+
+    threads = int(os.getenv("EMBEDDING_WORKER_THREADS", "0")) or max(1, (os.cpu_count() or 1) // workers)
+    return EmbeddingWorkerPool(
+        workers,
+        threads,
+        backend,
+        model_name,
+        model_dir,
+        start_method=os.getenv("EMBEDDING_WORKERS_START_METHOD", "spawn")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve embedding workers to web workers on this host")
+    parser.add_argument("--address", default="127.0.0.1:7300", help="host:port to listen on")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    parser.add_argument("--threads", type=int, default=0, help="Threads per worker (0 = cores / workers)")
+    parser.add_argument("--backend", default=os.getenv("EMBEDDING_BACKEND", "torch"), choices=BACKENDS)
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+    parser.add_argument("--model-dir", default=os.getenv("EMBEDDING_MODEL_DIR") or None)
+    args = parser.parse_args()
+    try:
+        authkey = require_authkey()
+    except RuntimeError as e:
+        parser.error(str(e))
+
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    pool = EmbeddingWorkerPool(args.workers, threads, args.backend, args.model, args.model_dir)
+    _PoolManager.register(
+        "pool",
+        callable=lambda: pool,
+        exposed=("get_sentence_embedding_dimension", "get_worker_count", "encode_into")
+    )
+    manager = _PoolManager(
+        address=parse_address(args.address),
+        authkey=authkey.encode("utf-8")
+    )
+    print(f"Embedding workers listening on {args.address}")
+    manager.get_server().serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,58 @@
 Embeddings module using SentenceTransformers
 """
 import os
-from typing import List
-from sentence_transformers import SentenceTransformer
+import re
+import hashlib
+from typing import List, Optional
+import threading
 import numpy as np
+from cache import LRUCache, SqliteCache, TieredCache
+from embedding_backends import load_backend
+from embedding_batcher import EmbeddingBatcher
+from embedding_workers import create_embedding_model
+from executors import get_executors
+from singleflight import ThreadSingleFlight
+
+_WHITESPACE_RE = re.compile(r'\s+')
 
 
 class EmbeddingService:
     """Service for generating text embeddings"""
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache: Optional[TieredCache] = None,
+        model=None
+    ):
         """
         Initialize embedding model
         
         Args:
             model_name: HuggingFace model name for embeddings
+            cache: Optional embedding cache keyed by (model name, text hash)
+            model: Preloaded encoder with the SentenceTransformer interface
+                (see embedding_backends); model_name is not loaded when given
         """
         self.model_name = model_name
-        print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.cache = cache
+        # Texts being encoded for one request are not encoded again for another
+        self._inflight = ThreadSingleFlight("embedding")
+        if model is None:
+            model = load_backend("torch", model_name)
+        self.model = model
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
         print(f"Model loaded. Embedding dimension: {self.embedding_dim}")
     
+    def close(self):
+        """Stop batching threads and embedding worker processes, if any"""
+        if hasattr(self.model, "close"):
+            self.model.close()
+    
+    def warmup(self):
+        """Run one uncached inference so the first request does not pay for lazy init"""
+        self.model.encode(["warm up the embedding model"], batch_size=1, convert_to_numpy=True)
+    
     def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
@@ -36,15 +67,15 @@ class EmbeddingService:
         if not text or not text.strip():
             return np.zeros(self.embedding_dim)
         
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding
+        return self.embed_documents([text])[0]
     
-    def embed_documents(self, texts: List[str]) -> np.ndarray:
+    def embed_documents(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """
         Generate embeddings for multiple texts
         
         Args:
             texts: List of text strings
+            batch_size: Number of texts encoded per forward pass
             
         Returns:
             Numpy array of shape (n_texts, embedding_dim)
@@ -58,9 +89,43 @@ class EmbeddingService:
         if not valid_texts:
             return np.array([])
         
-        embeddings = self.model.encode(valid_texts, convert_to_numpy=True)
+        # Only encode cache misses, then reassemble in input order
+        keys = [self._cache_key(t) for t in valid_texts]
+        embeddings = np.empty((len(valid_texts), self.embedding_dim), dtype=np.float32)
+        missing = {}
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                embeddings[i] = cached
+        
+        if missing:
+            texts_by_key = {key: valid_texts[positions[0]] for key, positions in missing.items()}
+            encoded = self._inflight.do_many(
+                list(missing),
+                lambda miss_keys: self._encode_and_cache(miss_keys, [texts_by_key[k] for k in miss_keys], batch_size)
+            )
+            for positions, embedding in zip(missing.values(), encoded):
+                embeddings[positions] = embedding
+        
+        return embeddings
+    
+    def _encode_and_cache(self, keys: List[str], texts: List[str], batch_size: int) -> List[np.ndarray]:
+        """Encode texts in one batch and cache them under their keys"""
+        encoded = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        embeddings = [np.asarray(embedding, dtype=np.float32) for embedding in encoded]
+        if self.cache is not None:
+            for key, embedding in zip(keys, embeddings):
+                self.cache.set(key, embedding)
         return embeddings
     
+    def _cache_key(self, text: str) -> str:
+        """Cache key for a text under the current model"""
+        normalized = _WHITESPACE_RE.sub(' ', text).strip()
+        digest = hashlib.sha256(f"{self.model_name}\0{normalized}".encode("utf-8"))
+        return digest.hexdigest()
+    
     def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Compute cosine similarity between two embeddings
@@ -84,14 +149,62 @@ class EmbeddingService:
         return float(similarity)
 
 
+def _create_embedding_cache() -> Optional[TieredCache]:
+    """Build the embedding cache from environment settings"""
+    max_items = int(os.getenv("EMBEDDING_CACHE_ITEMS", "20000"))
+    if max_items <= 0:
+        return None
+    
+    memory = LRUCache(
+        max_items=max_items,
+        max_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+    )
+    disk_path = os.getenv("EMBEDDING_CACHE_PATH")
+    disk = None
+    if disk_path:
+        disk = SqliteCache(
+            disk_path,
+            max_bytes=int(os.getenv("EMBEDDING_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+        )
+    
+    # Vectors are stored as float16 on disk to halve their footprint
+    return TieredCache(
+        memory,
+        disk,
+        encode=lambda embedding: embedding.astype(np.float16).tobytes(),
+        decode=lambda data: np.frombuffer(data, dtype=np.float16).astype(np.float32),
+        sizeof=lambda embedding: embedding.nbytes
+    )
+
+
 # Global instance
 _embedding_service = None
+_embedding_service_lock = threading.Lock()
 
 
 def get_embedding_service() -> EmbeddingService:
     """Get or create global embedding service instance"""
     global _embedding_service
     if _embedding_service is None:
-        model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-        _embedding_service = EmbeddingService(model_name)
+        # Warmup and an early request may race to load the model
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+                backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+                # In-process model, or a pool of embedding worker processes
+                model = create_embedding_model(backend, model_name, os.getenv("EMBEDDING_MODEL_DIR") or None)
+                if os.getenv("EMBEDDING_MICROBATCH_ENABLED", "true").lower() == "true":
+                    # Merge encode calls from concurrent requests into shared batches
+                    model = EmbeddingBatcher(
+                        model,
+                        max_batch_size=int(os.getenv("EMBEDDING_MICROBATCH_MAX_SIZE", "64")),
+                        max_wait_ms=float(os.getenv("EMBEDDING_MICROBATCH_MAX_WAIT_MS", "5")),
+                        # Keep every worker process busy
+                        concurrency=getattr(model, "workers", 1),
+                        # Encode calls come from the embedding thread pool
+                        max_callers=get_executors().embedding_workers
+                    )
+                # Backends produce slightly different vectors, so they must not share cache entries
+                cache_name = model_name if backend == "torch" else f"{model_name}:{backend}"
+                _embedding_service = EmbeddingService(cache_name, cache=_create_embedding_cache(), model=model)
     return _embedding_service
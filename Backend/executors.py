@@ -0,0 +1,127 @@
+"""
+Execution pools for the blocking stages of the analysis pipeline
+
+The event loop only coordinates: PDF parsing runs in a process pool and
+embedding/FAISS work runs in a thread pool, so one slow request cannot
+stall the rest of the worker.
+"""
+import os
+import asyncio
+import contextvars
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+# How often run_pdf_timed checks whether a queued call has started
+START_POLL_INTERVAL = 0.05
+
+
+class StageExecutors:
+    """Bounded pools for CPU-bound pipeline stages"""
+
+    def __init__(
+        self,
+        pdf_workers: int = 2,
+        embedding_workers: int = 4,
+        start_method: str = "spawn"
+    ):
+        """
+        Initialize stage executors (pools are created lazily)
+
+        Args:
+            pdf_workers: Processes used for PDF parsing (0 parses in a thread)
+            embedding_workers: Threads used for embedding and vector search
+            start_method: multiprocessing start method for the PDF pool
+        """
+        self.pdf_workers = pdf_workers
+        self.embedding_workers = max(1, embedding_workers)
+        self.start_method = start_method
+        self._pdf_pool: Optional[Executor] = None
+        self._embedding_pool: Optional[Executor] = None
+
+    @property
+    def pdf_pool(self) -> Executor:
+        """Pool used for PDF parsing"""
+        if self._pdf_pool is None:
+            if self.pdf_workers > 0:
+                self._pdf_pool = ProcessPoolExecutor(
+                    max_workers=self.pdf_workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            else:
+                self._pdf_pool = ThreadPoolExecutor(
+                    max_workers=self.embedding_workers,
+                    thread_name_prefix="pdf"
+                )
+        return self._pdf_pool
+
+    @property
+    def embedding_pool(self) -> Executor:
+        """Pool used for embedding and vector search"""
+        if self._embedding_pool is None:
+            self._embedding_pool = ThreadPoolExecutor(
+                max_workers=self.embedding_workers,
+                thread_name_prefix="embedding"
+            )
+        return self._embedding_pool
+
+    @staticmethod
+    async def _run(pool: Executor, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, partial(func, *args, **kwargs))
+
+    async def run_pdf(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a picklable function in the PDF pool"""
+        return await self._run(self.pdf_pool, func, *args, **kwargs)
+
+    async def run_pdf_timed(self, timeout: float, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a picklable function in the PDF pool with a limit on its running time
+
+        The timeout starts once a worker picks the call up, so time spent queued
+        behind other documents does not count. A process pool hands one call
+        beyond its busy workers over early, so that call's clock can start a
+        little before it really runs.
+
+        Raises:
+            asyncio.TimeoutError: If the call runs for longer than timeout
+        """
+        future = self.pdf_pool.submit(partial(func, *args, **kwargs))
+        waiter = asyncio.wrap_future(future)
+        try:
+            while not future.running() and not waiter.done():
+                await asyncio.wait({waiter}, timeout=START_POLL_INTERVAL)
+        except asyncio.CancelledError:
+            waiter.cancel()
+            raise
+        return await asyncio.wait_for(waiter, timeout)
+
+    async def run_embedding(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a function in the embedding thread pool (in a copy of the caller's context)"""
+        context = contextvars.copy_context()
+        return await self._run(self.embedding_pool, context.run, func, *args, **kwargs)
+
+    def shutdown(self):
+        """Shut down all pools"""
+        for pool in (self._pdf_pool, self._embedding_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pdf_pool = None
+        self._embedding_pool = None
+
+
+# Global instance
+_executors = None
+
+
+def get_executors() -> StageExecutors:
+    """Get or create global stage executors"""
+    global _executors
+    if _executors is None:
+        _executors = StageExecutors(
+            pdf_workers=int(os.getenv("PDF_POOL_WORKERS", "2")),
+            embedding_workers=int(os.getenv("EMBEDDING_POOL_WORKERS", "4")),
+            start_method=os.getenv("PDF_POOL_START_METHOD", "spawn")
+        )
+    return _executors
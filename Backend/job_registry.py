@@ -0,0 +1,247 @@
+"""
+Registered job descriptions with precomputed artifacts
+
+A job description screened against many resumes is registered once. Its
+embedding, per-section embeddings and skill list are computed at
+registration and stored in sqlite, so analyses that pass a job_id skip all
+job description processing.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from cache import LRUCache
+from embeddings import get_embedding_service
+from rag import get_rag_service
+from skills import get_skill_extractor
+
+
+def job_id_for(description: str) -> str:
+    """Stable ID of a job description, so registering it twice is a no-op"""
+    normalized = " ".join(description.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class JobProfile:
+    """A registered job description and everything derived from it"""
+
+    def __init__(
+        self,
+        job_id: str,
+        title: str,
+        description: str,
+        skills: List[str],
+        chunks: List[str],
+        embedding: np.ndarray,
+        chunk_embeddings: np.ndarray,
+        model_name: str,
+        created_at: float
+    ):
+        self.job_id = job_id
+        self.title = title
+        self.description = description
+        self.skills = skills
+        self.chunks = chunks
+        self.embedding = embedding
+        self.chunk_embeddings = chunk_embeddings
+        self.model_name = model_name
+        self.created_at = created_at
+        # The whole-description embedding is truncated at the model's maximum
+        # sequence length, so every section also queries the resume
+        self.query_embeddings = np.vstack([embedding.reshape(1, -1), chunk_embeddings]).astype(np.float32)
+
+    def summary(self) -> Dict[str, Any]:
+        """Public fields for API responses"""
+        return {
+            "job_id": self.job_id,
+            "title": self.title,
+            "skills": self.skills,
+            "sections": len(self.chunks),
+            "created_at": self.created_at
+        }
+
+
+class JobRegistry:
+    """sqlite-backed store of job profiles with an in-memory LRU in front"""
+
+    def __init__(self, path: str, cache_items: int = 256):
+        """
+        Initialize registry
+
+        Args:
+            path: sqlite database file
+            cache_items: Profiles kept in memory
+        """
+        self.path = path
+        self._profiles = LRUCache(max_items=cache_items)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT NOT NULL, "
+            "skills TEXT NOT NULL, chunks TEXT NOT NULL, embedding BLOB NOT NULL, "
+            "chunk_embeddings BLOB NOT NULL, model TEXT NOT NULL, created REAL NOT NULL)"
+        )
+
+    def build(self, description: str, title: str = "", skills: Optional[List[str]] = None) -> JobProfile:
+        """
+        Compute the artifacts of a job description (blocking)
+
+        Args:
+            description: Job description text
+            title: Display title
+            skills: Skill list extracted elsewhere (e.g. by the LLM); the local
+                skill extractor is used when None
+
+        Returns:
+            New JobProfile (not stored)
+        """
+        if skills is None:
+            extractor = get_skill_extractor()
+            skills = extractor.extract(description) if extractor is not None else []
+
+        embedding_service = get_embedding_service()
+        chunker = get_rag_service().chunker
+        chunks = chunker.chunk_text(chunker.clean_text(description))
+        # Whole description and its sections in one batch
+        embeddings = np.asarray(embedding_service.embed_documents([description] + chunks), dtype=np.float32)
+
+        return JobProfile(
+            job_id=job_id_for(description),
+            title=title,
+            description=description,
+            skills=skills,
+            chunks=chunks,
+            embedding=embeddings[0],
+            chunk_embeddings=embeddings[1:],
+            model_name=embedding_service.model_name,
+            created_at=time.time()
+        )
+
+    def register(self, description: str, title: str = "", skills: Optional[List[str]] = None) -> JobProfile:
+        """
+        Build and store a job profile, replacing one with the same text
+
+        Args:
+            description: Job description text
+            title: Display title
+            skills: Skill list extracted elsewhere (local extraction when None)
+
+        Returns:
+            Stored JobProfile
+        """
+        profile = self.build(description, title, skills)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs "
+                "(job_id, title, description, skills, chunks, embedding, chunk_embeddings, model, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    profile.job_id,
+                    profile.title,
+                    profile.description,
+                    json.dumps(profile.skills),
+                    json.dumps(profile.chunks),
+                    profile.embedding.tobytes(),
+                    profile.chunk_embeddings.tobytes(),
+                    profile.model_name,
+                    profile.created_at
+                )
+            )
+        self._profiles.set(profile.job_id, profile)
+        return profile
+
+    def get(self, job_id: str) -> Optional[JobProfile]:
+        """
+        Load a job profile
+
+        Profiles stored under a different embedding model are recomputed,
+        keeping their skill list.
+
+        Args:
+            job_id: Job ID returned by register
+
+        Returns:
+            JobProfile, or None if the job is unknown
+        """
+        profile = self._profiles.get(job_id)
+        if profile is not None:
+            return profile
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, description, skills, chunks, embedding, chunk_embeddings, model, created "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        title, description, skills, chunks, embedding, chunk_embeddings, model_name, created = row
+        if model_name != get_embedding_service().model_name:
+            return self.register(description, title, json.loads(skills))
+
+        embedding = np.frombuffer(embedding, dtype=np.float32)
+        profile = JobProfile(
+            job_id=job_id,
+            title=title,
+            description=description,
+            skills=json.loads(skills),
+            chunks=json.loads(chunks),
+            embedding=embedding,
+            chunk_embeddings=np.frombuffer(chunk_embeddings, dtype=np.float32).reshape(-1, embedding.size),
+            model_name=model_name,
+            created_at=created
+        )
+        self._profiles.set(job_id, profile)
+        return profile
+
+    def list_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recently registered jobs, without their embeddings"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, title, skills, chunks, created FROM jobs ORDER BY created DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {
+                "job_id": job_id,
+                "title": title,
+                "skills": json.loads(skills),
+                "sections": len(json.loads(chunks)),
+                "created_at": created
+            }
+            for job_id, title, skills, chunks, created in rows
+        ]
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a job; returns False if it did not exist"""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,)).rowcount
+        self._profiles.set(job_id, None)
+        return deleted > 0
+
+
+# Global instance
+_job_registry = None
+
+
+def get_job_registry() -> JobRegistry:
+    """Get or create global job registry"""
+    global _job_registry
+    if _job_registry is None:
+        _job_registry = JobRegistry(
+            os.getenv("JOB_REGISTRY_PATH", "storage/jobs.sqlite"),
+            cache_items=int(os.getenv("JOB_REGISTRY_CACHE_ITEMS", "256"))
+        )
+    return _job_registry
@@ -0,0 +1,61 @@
+"""
+Deferred imports for heavy dependencies
+
+sentence_transformers (torch), faiss and openai dominate import time. Modules
+reference them through a LazyModule so importing main stays fast and the cost
+moves to background warmup; each deferred import is timed as a metric.
+"""
+import time
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Dict, Optional
+from metrics import IMPORT_SECONDS
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        """
+        Initialize proxy
+
+        Args:
+            name: Importable module name
+        """
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> ModuleType:
+        """Import the module now (no-op once loaded)"""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    IMPORT_SECONDS.labels(self._name).set(time.perf_counter() - start)
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the module has been imported"""
+        return self._module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+_lazy_modules: Dict[str, LazyModule] = {}
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Reference a module without importing it yet (one shared proxy per name)"""
+    if name not in _lazy_modules:
+        _lazy_modules[name] = LazyModule(name)
+    return _lazy_modules[name]
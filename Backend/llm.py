@@ -3,35 +3,107 @@ LLM module for interacting with OpenAI API
 """
 import os
 import json
-from typing import Dict, Any
-from openai import OpenAI
+import copy
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from cache import LRUCache, SqliteCache, TieredCache
+from context_builder import get_context_builder
+from lazy_imports import lazy_module
+from metrics import LLM_CALLS_IN_FLIGHT, LLM_RETRIES, record_llm_usage, stage
+from singleflight import SingleFlight
+
+# Deferred until the service is created; openai alone takes over a second to import
+httpx = lazy_module("httpx")
+openai = lazy_module("openai")
+
+
+def retryable_errors() -> Tuple[type, ...]:
+    """Errors worth retrying with backoff"""
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
 
 
 class LLMService:
     """Service for LLM-based analysis"""
     
-    def __init__(self):
-        """Initialize OpenAI client"""
+    def __init__(self, cache: Optional[TieredCache] = None):
+        """
+        Initialize OpenAI client
+        
+        Args:
+            cache: Optional response cache keyed on the full request
+        """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         
-        self.client = OpenAI(api_key=api_key)
+        # OPENAI_BASE_URL lets tests point the client at a local stub server
+        base_url = os.getenv("OPENAI_BASE_URL") or None
+        max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", "16"))
+        
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        # One pooled HTTP client shared by all async calls; retries are ours
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_in_flight,
+                max_keepalive_connections=max_in_flight
+            ),
+            timeout=httpx.Timeout(float(os.getenv("LLM_REQUEST_TIMEOUT", "60")), connect=10.0)
+        )
+        self.async_client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=0
+        )
         self.model = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
         self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.3"))
         self.max_tokens = int(os.getenv("MAX_TOKENS", "2000"))
+        self.cache = cache
+        
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+        self.deadline = float(os.getenv("LLM_DEADLINE_SECONDS", "90"))
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        # Identical prompts in flight at the same time share one completion
+        self._inflight = SingleFlight("llm")
     
-    def analyze_resume_vs_job(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+    def _build_messages(
+        self,
+        resume_text: str,
+        job_description: str,
+        skills: Optional[Dict[str, List[str]]] = None,
+        jd_skills: Optional[List[str]] = None
+    ) -> List[Dict[str, str]]:
         """
-        Analyze resume against job description using LLM
+        Build chat messages for resume analysis
         
         Args:
             resume_text: Extracted resume text
             job_description: Job description text
+            skills: Locally extracted skill lists; when given the LLM only
+                writes strengths, suggestions and the summary
+            jd_skills: Skills of a registered job; when given the LLM does not
+                extract them again
             
         Returns:
-            Dictionary with analysis results
+            List of chat messages
         """
+        if skills is not None:
+            return self._build_narrative_messages(resume_text, job_description, skills)
+        if jd_skills is not None:
+            return self._build_known_job_messages(resume_text, job_description, jd_skills)
+        
+        context_builder = get_context_builder()
         system_prompt = """You are an expert HR analyst and ATS (Applicant Tracking System) specialist.
 Your job is to analyze resumes against job descriptions and provide detailed, actionable feedback.
 
@@ -59,37 +131,435 @@ Guidelines:
         user_prompt = f"""Analyze the following resume against the job description:
 
 RESUME:
-{resume_text[:4000]}
+{context_builder.truncate_resume(resume_text)}
+
+JOB DESCRIPTION:
+{context_builder.truncate_job_description(job_description)}
+
+Provide a comprehensive analysis in JSON format."""
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _build_narrative_messages(
+        self,
+        resume_text: str,
+        job_description: str,
+        skills: Dict[str, List[str]]
+    ) -> List[Dict[str, str]]:
+        """Build chat messages when skills were already extracted locally"""
+        context_builder = get_context_builder()
+        system_prompt = """You are an expert HR analyst and ATS (Applicant Tracking System) specialist.
+Skill matching has already been done. Your job is to give detailed, actionable feedback.
+
+You MUST return your response as a valid JSON object with the following structure:
+{
+    "strengths": ["strength1", "strength2", ...],
+    "suggestions": ["suggestion1", "suggestion2", ...],
+    "summary": "Brief 2-3 sentence summary of the analysis"
+}
+
+Guidelines:
+- Highlight 3-5 key strengths from the resume
+- Provide 3-5 actionable improvement suggestions, focusing on the missing skills
+- Keep summary concise and professional
+- Return ONLY valid JSON, no markdown or extra text
+"""
+        
+        user_prompt = f"""Review the following resume against the job description.
+
+MATCHED SKILLS: {", ".join(skills["matched_skills"]) or "none"}
+MISSING SKILLS: {", ".join(skills["missing_skills"]) or "none"}
+
+RESUME:
+{context_builder.truncate_resume(resume_text)}
 
 JOB DESCRIPTION:
-{job_description[:2000]}
+{context_builder.truncate_job_description(job_description)}
+
+Provide your feedback in JSON format."""
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _build_known_job_messages(
+        self,
+        resume_text: str,
+        job_description: str,
+        jd_skills: List[str]
+    ) -> List[Dict[str, str]]:
+        """Build chat messages when the job's skills were extracted at registration"""
+        context_builder = get_context_builder()
+        system_prompt = """You are an expert HR analyst and ATS (Applicant Tracking System) specialist.
+The skills required by the job have already been extracted. Your job is to match the resume
+against them and provide detailed, actionable feedback.
+
+You MUST return your response as a valid JSON object with the following structure:
+{
+    "resume_skills": ["skill1", "skill2", ...],
+    "missing_skills": ["skill1", "skill2", ...],
+    "matched_skills": ["skill1", "skill2", ...],
+    "strengths": ["strength1", "strength2", ...],
+    "suggestions": ["suggestion1", "suggestion2", ...],
+    "summary": "Brief 2-3 sentence summary of the analysis"
+}
+
+Guidelines:
+- Extract ALL technical and soft skills from the resume
+- matched_skills and missing_skills must only contain skills from the JOB SKILLS list
+- Highlight 3-5 key strengths from the resume
+- Provide 3-5 actionable improvement suggestions
+- Keep summary concise and professional
+- Return ONLY valid JSON, no markdown or extra text
+"""
+        
+        user_prompt = f"""Analyze the following resume against the job description.
+
+JOB SKILLS: {", ".join(jd_skills) or "none"}
+
+RESUME:
+{context_builder.truncate_resume(resume_text)}
+
+JOB DESCRIPTION:
+{context_builder.truncate_job_description(job_description)}
 
 Provide a comprehensive analysis in JSON format."""
         
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _cache_key(self, messages: List[Dict[str, str]]) -> str:
+        """Deterministic cache key for a completion request"""
+        payload = json.dumps(
+            [self.model, [m["content"] for m in messages], self.max_tokens],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _cached_response(self, cache_key: str, use_cache: bool) -> Optional[Dict[str, Any]]:
+        """Look up a cached analysis"""
+        if self.cache is None or not use_cache:
+            return None
+        cached = self.cache.get(cache_key)
+        return copy.deepcopy(cached) if cached is not None else None
+    
+    def _store_response(self, cache_key: str, result: Dict[str, Any]):
+        """Store an analysis in the cache"""
+        if self.cache is not None:
+            self.cache.set(cache_key, copy.deepcopy(result))
+    
+    async def _cached_response_async(self, cache_key: str, use_cache: bool) -> Optional[Dict[str, Any]]:
+        """Look up a cached analysis without blocking the event loop on the disk tier"""
+        if self.cache is None or not use_cache:
+            return None
+        cached = await self.cache.aget(cache_key)
+        return copy.deepcopy(cached) if cached is not None else None
+    
+    async def _store_response_async(self, cache_key: str, result: Dict[str, Any]):
+        """Store an analysis without blocking the event loop on the disk tier"""
+        if self.cache is not None:
+            await self.cache.aset(cache_key, copy.deepcopy(result))
+    
+    def analyze_resume_vs_job(
+        self,
+        resume_text: str,
+        job_description: str,
+        use_cache: bool = True,
+        skills: Optional[Dict[str, List[str]]] = None,
+        jd_skills: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze resume against job description using LLM
+        
+        Args:
+            resume_text: Extracted resume text
+            job_description: Job description text
+            use_cache: Return a cached analysis for identical requests
+            skills: Locally extracted skill lists to use instead of LLM extraction
+            jd_skills: Skills of a registered job, used instead of extracting them
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        messages = self._build_messages(resume_text, job_description, skills, jd_skills)
+        cache_key = self._cache_key(messages)
+        cached = self._cached_response(cache_key, use_cache)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0,
-                max_tokens=self.max_tokens,
-                response_format={"type": "json_object"}
-            )
+            with stage("llm_call"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0,
+                    max_tokens=self.max_tokens,
+                    response_format={"type": "json_object"}
+                )
+            record_llm_usage(response.usage)
             
             content = response.choices[0].message.content
             result = json.loads(content)
             
             # Validate and normalize response
-            return self._normalize_response(result)
+            normalized = self._normalize_response(result, skills, jd_skills)
+            self._store_response(cache_key, normalized)
+            return normalized
+            
+        except Exception as e:
+            print(f"LLM Error: {str(e)}")
+            raise
+    
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honoring Retry-After when sent"""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    async def _create_completion(self, messages: List[Dict[str, str]], deadline: float, stream: bool = False):
+        """
+        Call the chat completions API with concurrency limiting and retries
+        
+        Args:
+            messages: Chat messages
+            deadline: Seconds the whole call, including retries, may take
+            stream: Return an async stream of chunks once the response starts
+            
+        Returns:
+            OpenAI chat completion (or chunk stream)
+            
+        Raises:
+            asyncio.TimeoutError: If the deadline is exceeded
+        """
+        deadline_at = time.monotonic() + deadline
+        attempt = 0
+        
+        while True:
+            try:
+                async with self._semaphore:
+                    remaining = deadline_at - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError("LLM deadline exceeded")
+                    with LLM_CALLS_IN_FLIGHT.track_inprogress():
+                        return await asyncio.wait_for(
+                            self.async_client.chat.completions.create(
+                                model=self.model,
+                                messages=messages,
+                                temperature=0,
+                                max_tokens=self.max_tokens,
+                                response_format={"type": "json_object"},
+                                stream=stream,
+                                timeout=remaining
+                            ),
+                            timeout=remaining
+                        )
+            except retryable_errors() as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                if time.monotonic() + delay >= deadline_at:
+                    raise
+                attempt += 1
+                LLM_RETRIES.inc()
+                print(f"LLM call failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
+    async def analyze_resume_vs_job_async(
+        self,
+        resume_text: str,
+        job_description: str,
+        use_cache: bool = True,
+        skills: Optional[Dict[str, List[str]]] = None,
+        jd_skills: Optional[List[str]] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze resume against job description without blocking the event loop
+        
+        Args:
+            resume_text: Extracted resume text
+            job_description: Job description text
+            use_cache: Return a cached analysis for identical requests
+            skills: Locally extracted skill lists to use instead of LLM extraction
+            jd_skills: Skills of a registered job, used instead of extracting them
+            deadline: Seconds allowed for the call including retries
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        messages = self._build_messages(resume_text, job_description, skills, jd_skills)
+        cache_key = self._cache_key(messages)
+        cached = await self._cached_response_async(cache_key, use_cache)
+        if cached is not None:
+            return cached
+        
+        async def complete() -> Dict[str, Any]:
+            try:
+                with stage("llm_call"):
+                    response = await self._create_completion(messages, deadline or self.deadline)
+                record_llm_usage(getattr(response, "usage", None))
+                
+                content = response.choices[0].message.content
+                result = json.loads(content)
+                
+                normalized = self._normalize_response(result, skills, jd_skills)
+                await self._store_response_async(cache_key, normalized)
+                return normalized
+                
+            except Exception as e:
+                print(f"LLM Error: {str(e)}")
+                raise
+        
+        # Each caller gets its own copy of a shared result
+        return copy.deepcopy(await self._inflight.do(cache_key, complete))
+    
+    async def stream_analysis(
+        self,
+        resume_text: str,
+        job_description: str,
+        use_cache: bool = True,
+        skills: Optional[Dict[str, List[str]]] = None,
+        jd_skills: Optional[List[str]] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream an analysis as it is generated
+        
+        Args:
+            resume_text: Extracted resume text
+            job_description: Job description text
+            use_cache: Return a cached analysis for identical requests
+            skills: Locally extracted skill lists to use instead of LLM extraction
+            jd_skills: Skills of a registered job, used instead of extracting them
+            deadline: Seconds allowed for the call including retries
+            
+        Yields:
+            ("delta", raw JSON text) while generating, then ("result", normalized dict)
+        """
+        messages = self._build_messages(resume_text, job_description, skills, jd_skills)
+        cache_key = self._cache_key(messages)
+        cached = await self._cached_response_async(cache_key, use_cache)
+        if cached is not None:
+            yield "delta", json.dumps(cached)
+            yield "result", cached
+            return
+        
+        deadline = deadline or self.deadline
+        deadline_at = time.monotonic() + deadline
+        parts = []
+        
+        try:
+            # Spans the whole stream, including time the consumer holds each delta
+            with stage("llm_call"):
+                stream = await self._create_completion(messages, deadline, stream=True)
+                try:
+                    async for chunk in stream:
+                        if time.monotonic() > deadline_at:
+                            raise asyncio.TimeoutError("LLM deadline exceeded")
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            parts.append(delta)
+                            yield "delta", delta
+                finally:
+                    await stream.close()
+            
+            result = json.loads("".join(parts))
+            normalized = self._normalize_response(result, skills, jd_skills)
+            await self._store_response_async(cache_key, normalized)
+            yield "result", normalized
             
         except Exception as e:
             print(f"LLM Error: {str(e)}")
             raise
     
-    def _normalize_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
-        """Normalize and validate LLM response"""
+    async def extract_job_skills_async(
+        self,
+        job_description: str,
+        deadline: Optional[float] = None
+    ) -> List[str]:
+        """
+        Extract the skills a job requires, once per registered job
+        
+        Args:
+            job_description: Job description text
+            deadline: Seconds allowed for the call including retries
+            
+        Returns:
+            List of skills
+        """
+        context_builder = get_context_builder()
+        messages = [
+            {
+                "role": "system",
+                "content": """You are an expert HR analyst and ATS (Applicant Tracking System) specialist.
+Extract ALL technical and soft skills required by the job description.
+
+You MUST return your response as a valid JSON object with the following structure:
+{
+    "jd_skills": ["skill1", "skill2", ...]
+}
+
+Be specific and granular (e.g., "Python 3.x" not just "Python").
+Return ONLY valid JSON, no markdown or extra text
+"""
+            },
+            {
+                "role": "user",
+                "content": f"""JOB DESCRIPTION:
+{context_builder.truncate_job_description(job_description)}"""
+            }
+        ]
+        cache_key = self._cache_key(messages)
+        cached = await self._cached_response_async(cache_key, True)
+        if cached is not None:
+            return cached["jd_skills"]
+        
+        async def complete() -> List[str]:
+            try:
+                with stage("llm_call"):
+                    response = await self._create_completion(messages, deadline or self.deadline)
+                record_llm_usage(getattr(response, "usage", None))
+                
+                skills = json.loads(response.choices[0].message.content).get("jd_skills", [])
+                if not isinstance(skills, list):
+                    skills = []
+                await self._store_response_async(cache_key, {"jd_skills": skills})
+                return skills
+                
+            except Exception as e:
+                print(f"LLM Error: {str(e)}")
+                raise
+        
+        return list(await self._inflight.do(cache_key, complete))
+    
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        await self.http_client.aclose()
+    
+    def _normalize_response(
+        self,
+        result: Dict[str, Any],
+        skills: Optional[Dict[str, List[str]]] = None,
+        jd_skills: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Normalize and validate LLM response, overlaying known skill lists"""
+        if skills is not None:
+            result = {**result, **skills}
+        elif jd_skills is not None:
+            result = {**result, "jd_skills": jd_skills}
+        
         normalized = {
             "resume_skills": result.get("resume_skills", []),
             "jd_skills": result.get("jd_skills", []),
@@ -128,13 +598,45 @@ Provide a comprehensive analysis in JSON format."""
         return round(score, 2)
 
 
+def _create_response_cache() -> Optional[TieredCache]:
+    """Build the LLM response cache from environment settings"""
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    
+    ttl_seconds = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    memory = LRUCache(
+        max_items=int(os.getenv("LLM_CACHE_ITEMS", "1024")),
+        ttl_seconds=ttl_seconds
+    )
+    disk_path = os.getenv("LLM_CACHE_PATH", "storage/llm_cache.sqlite")
+    disk = None
+    if disk_path:
+        disk = SqliteCache(
+            disk_path,
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            ttl_seconds=ttl_seconds
+        )
+    
+    return TieredCache(
+        memory,
+        disk,
+        encode=lambda result: json.dumps(result).encode("utf-8"),
+        decode=lambda data: json.loads(data.decode("utf-8")),
+        sizeof=lambda result: 1
+    )
+
+
 # Global instance
 _llm_service = None
+_llm_service_lock = threading.Lock()
 
 
 def get_llm_service() -> LLMService:
     """Get or create global LLM service instance"""
     global _llm_service
     if _llm_service is None:
-        _llm_service = LLMService()
+        # Warmup and an early request may race to create the client
+        with _llm_service_lock:
+            if _llm_service is None:
+                _llm_service = LLMService(cache=_create_response_cache())
     return _llm_service
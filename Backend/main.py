@@ -1,22 +1,56 @@
 """
 FastAPI Backend for AI Resume Analyzer
 """
+import time
+_IMPORT_STARTED = time.perf_counter()
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import os
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+import json
+import hashlib
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from dotenv import load_dotenv
-import PyPDF2
-from io import BytesIO
 
-from schemas import AnalysisResponse, ErrorResponse
+from schemas import (
+    AnalysisResponse, ErrorResponse, BatchItemResult, BatchAnalysisResponse,
+    CandidateIngestResult, CandidateIngestResponse, RankRequest, RankedCandidate, RankResponse,
+    JobCreateRequest, JobResponse, JobListResponse, TaskSubmitResponse, TaskStatusResponse
+)
 from rag import get_rag_service
 from llm import get_llm_service
+from context_builder import get_context_builder
 from embeddings import get_embedding_service
+from embedding_workers import require_authkey
+from executors import get_executors
+from candidate_index import get_candidate_index
+from job_registry import JobProfile, get_job_registry, job_id_for
+from task_queue import PermanentTaskError, TaskWorkers, get_task_queue
+from singleflight import SingleFlight
+from cache import get_text_cache
+from pdf_extractor import (
+    ExtractionLimits, ExtractionLimitError, extract_page_range, extract_text_or_count, split_pages
+)
+from uploads import PdfUpload, UploadRejectedError, UploadTooLargeError, read_pdf_upload
+from streaming import JSONListItemParser, sse_event
+from skills import get_skill_extractor
+from skill_matcher import get_skill_matcher
+from metrics import (
+    IMPORT_SECONDS, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, TASKS_QUEUED, register_caches, stage, start_trace
+)
+from lazy_imports import lazy_module
+from warmup import Warmup
+
+# Only needed for its exception types, so it stays unimported until then
+openai = lazy_module("openai")
+
+IMPORT_SECONDS.labels("main").set(time.perf_counter() - _IMPORT_STARTED)
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +62,28 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Batch limits
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "200"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+# PDF extraction budgets
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")
+PDF_LIMITS = ExtractionLimits(
+    max_pages=int(os.getenv("PDF_MAX_PAGES", "50")),
+    max_bytes=int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024))),
+    time_budget=float(os.getenv("PDF_TIME_BUDGET_SECONDS", "20"))
+)
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "16"))
+
+# Uploads above the threshold are spooled to disk (uploads are capped at PDF_MAX_BYTES)
+UPLOAD_SPOOL_THRESHOLD_BYTES = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_BYTES", str(1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Asynchronous analyses (0 workers: this process only accepts and serves tasks)
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))
+TASK_MAX_WAIT_SECONDS = float(os.getenv("TASK_MAX_WAIT_SECONDS", "30"))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -38,55 +94,475 @@ app.add_middleware(
 )
 
 
-def extract_text_from_pdf(pdf_file: bytes) -> str:
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Observe request latency per route and track requests in flight"""
+    start = time.perf_counter()
+    status = 500
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        # Label by route template so path parameters do not explode cardinality
+        route = request.scope.get("route")
+        REQUEST_SECONDS.labels(
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(status)
+        ).observe(time.perf_counter() - start)
+
+
+def _warm_embedding_service():
+    get_embedding_service().warmup()
+
+
+def _warm_rag_service():
+    # Creating a pooled vector store imports faiss ahead of the first request
+    with get_rag_service().context():
+        pass
+
+
+# Services are loaded in the background after startup; /ready reports progress
+warmup = Warmup()
+warmup.register("embedding", _warm_embedding_service)
+warmup.register("rag", _warm_rag_service)
+warmup.register("llm", get_llm_service)
+warmup.register("skills", lambda: get_skill_extractor() is not None, required=False)
+warmup.register("candidate_index", get_candidate_index)
+
+# Identical analyses and PDF uploads requested at the same time run once
+analysis_flights = SingleFlight("analysis")
+pdf_flights = SingleFlight("pdf_text")
+
+# Caches are only read once their service has loaded, so a scrape never triggers a load
+register_caches({
+    "pdf_text": get_text_cache,
+    "embeddings": lambda: get_embedding_service().cache if warmup.is_ready("embedding") else None,
+    "llm": lambda: get_llm_service().cache if warmup.is_ready("llm") else None
+})
+
+
+async def extract_text_from_pdf(pdf_file: PdfUpload) -> str:
     """
-    Extract text from PDF file
+    Extract text from PDF file in the PDF worker pool
+    
+    Results are cached by the SHA-256 of the file, so repeat uploads skip
+    parsing entirely. Documents with more than PDF_PARALLEL_PAGE_THRESHOLD
+    pages are split into page ranges extracted in parallel.
     
     Args:
-        pdf_file: PDF file bytes
+        pdf_file: Uploaded PDF (workers receive its bytes or its spooled path)
         
     Returns:
         Extracted text
     """
-    try:
-        pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_file))
-        text = ""
-        
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
+    text_cache = get_text_cache()
+    cache_key = f"{pdf_file.digest}:{PDF_BACKEND}:{PDF_LIMITS.max_pages}"
+    cached_text = await text_cache.aget(cache_key)
+    if cached_text is not None:
+        return cached_text
+    
+    # The same file uploaded twice at once is parsed once
+    return await pdf_flights.do(cache_key, lambda: _parse_pdf(pdf_file, cache_key))
+
+
+async def _extract_in_pool(pdf_file) -> str:
+    """
+    Extract a PDF in the worker pool, splitting large documents into page ranges
+    
+    Each pool call gets the full time budget from when a worker starts it, so
+    waiting for a free worker is not charged to the document. Workers check
+    the budget between pages; the caller stops waiting once it is spent, so a
+    worker stuck inside one page finishes it in the background.
+    """
+    executors = get_executors()
+    budget = PDF_LIMITS.time_budget
+    text, page_count = await executors.run_pdf_timed(
+        budget, extract_text_or_count, pdf_file, PDF_BACKEND, PDF_LIMITS, PDF_PARALLEL_PAGE_THRESHOLD
+    )
+    if text is None:
+        ranges = split_pages(page_count, max(1, executors.pdf_workers))
+        parts = await asyncio.gather(*(
+            executors.run_pdf_timed(budget, extract_page_range, pdf_file, PDF_BACKEND, start, stop, budget)
+            for start, stop in ranges
+        ))
+        text = "\n".join(page for part in parts for page in part)
         if not text.strip():
             raise ValueError("No text could be extracted from PDF")
-        
-        return text
+    return text
+
+
+async def _parse_pdf(upload: PdfUpload, cache_key: str) -> str:
+    """Parse a PDF in the worker pool and cache its text"""
+    text_cache = get_text_cache()
+    try:
+        with stage("pdf_parse"):
+            try:
+                text = await _extract_in_pool(upload.source)
+            except asyncio.TimeoutError:
+                raise ExtractionLimitError("PDF extraction exceeded its time budget")
+    except ExtractionLimitError as e:
+        raise HTTPException(
+            status_code=413,
+            detail=f"PDF exceeds extraction limits: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=400,
             detail=f"Failed to extract text from PDF: {str(e)}"
         )
+    finally:
+        # Runs inside the coalesced task, so no other caller still needs the file
+        upload.close()
+    
+    await text_cache.aset(cache_key, text)
+    return text
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    print("Initializing services...")
+def validate_job_description(job_description: str):
+    """Reject job descriptions that are too short to analyze"""
+    if not job_description or len(job_description.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description must be at least 10 characters"
+        )
+
+
+async def read_resume_upload(resume: UploadFile) -> PdfUpload:
+    """
+    Validate an uploaded resume and read it in chunks
+    
+    The PDF header is checked on the first chunk and reading stops once
+    the file passes PDF_MAX_BYTES. Files above UPLOAD_SPOOL_THRESHOLD_BYTES
+    are spooled to disk instead of being held in memory.
+    
+    Args:
+        resume: Uploaded PDF file
+        
+    Returns:
+        Uploaded PDF with its SHA-256
+    """
+    if not (resume.filename or "").lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported"
+        )
+    
+    # The multipart parser already knows the size of most uploads
+    if resume.size is not None and resume.size > PDF_LIMITS.max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File is larger than the {PDF_LIMITS.max_bytes} byte limit"
+        )
+    
+    # Read PDF file
     try:
-        # Initialize embedding service
-        get_embedding_service()
-        print("✓ Embedding service ready")
+        with stage("upload_read"):
+            return await read_pdf_upload(
+                resume, PDF_LIMITS.max_bytes, UPLOAD_SPOOL_THRESHOLD_BYTES, UPLOAD_SPOOL_DIR
+            )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def resume_text_from_pdf(pdf_content: PdfUpload) -> str:
+    """
+    Extract resume text and reject resumes with too little text
+    
+    Args:
+        pdf_content: Uploaded PDF
+        
+    Returns:
+        Extracted resume text
+    """
+    resume_text = await extract_text_from_pdf(pdf_content)
+    
+    if len(resume_text.strip()) < 50:
+        raise HTTPException(
+            status_code=400,
+            detail="Resume text is too short or could not be extracted properly"
+        )
+    
+    return resume_text
+
+
+async def read_resume_text(resume: UploadFile) -> str:
+    """
+    Validate an uploaded resume and extract its text
+    
+    Args:
+        resume: Uploaded PDF file
         
-        # Initialize RAG service
-        get_rag_service()
-        print("✓ RAG service ready")
+    Returns:
+        Extracted resume text
+    """
+    return await resume_text_from_pdf(await read_resume_upload(resume))
+
+
+async def resolve_job(
+    job_description: Optional[str],
+    job_id: Optional[str]
+) -> Tuple[str, Optional[JobProfile]]:
+    """
+    Resolve the job of an analysis request
+    
+    Args:
+        job_description: Job description text from the form
+        job_id: ID of a job registered with POST /jobs
         
-        # Initialize LLM service
-        get_llm_service()
-        print("✓ LLM service ready")
+    Returns:
+        Tuple of (job description text, registered job or None)
+    """
+    if job_id:
+        if job_description:
+            raise HTTPException(
+                status_code=400,
+                detail="Pass either job_description or job_id, not both"
+            )
+        job = await get_executors().run_embedding(get_job_registry().get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job_id {job_id}")
+        return job.description, job
+    
+    validate_job_description(job_description or "")
+    return job_description, None
+
+
+def extract_skills(
+    resume_text: str,
+    job_description: str,
+    jd_skills: Optional[List[str]] = None
+) -> Optional[Dict[str, List[str]]]:
+    """
+    Match skills locally when the skill extractor is enabled
+    
+    Args:
+        resume_text: Raw resume text (cleaning would strip "C++" and "C#")
+        job_description: Job description text
+        jd_skills: Skills of a registered job, used instead of extracting them
         
-        print("All services initialized successfully!")
-    except Exception as e:
-        print(f"Error during initialization: {str(e)}")
-        raise
+    Returns:
+        Skill lists, or None to let the LLM extract skills
+    """
+    extractor = get_skill_extractor()
+    if extractor is None:
+        return None
+    if jd_skills is not None:
+        return extractor.match_extracted(extractor.extract(resume_text), jd_skills)
+    return extractor.match(resume_text, job_description)
+
+
+async def build_analysis_response(
+    analysis_result: dict,
+    skills: Optional[Dict[str, List[str]]] = None
+) -> AnalysisResponse:
+    """
+    Build API response from normalized LLM output
+    
+    Locally matched skills are used as they are, so the response agrees with
+    the prompt and the streamed items. Skills the LLM extracted as free text
+    are matched by embedding similarity when semantic matching is enabled.
+    
+    Args:
+        analysis_result: Normalized LLM analysis
+        skills: Skill lists from extract_skills, or None if the LLM extracted them
+        
+    Returns:
+        AnalysisResponse with match score
+    """
+    matched_skills = analysis_result["matched_skills"]
+    missing_skills = analysis_result["missing_skills"]
+    
+    skill_matcher = get_skill_matcher() if skills is None else None
+    if skill_matcher is not None:
+        match = await get_executors().run_embedding(
+            skill_matcher.match,
+            analysis_result["resume_skills"],
+            analysis_result["jd_skills"]
+        )
+        matched_skills = match["matched_skills"]
+        missing_skills = match["missing_skills"]
+        match_score = match["match_score"]
+    else:
+        match_score = get_llm_service().calculate_match_score(
+            matched_skills,
+            analysis_result["jd_skills"]
+        )
+    
+    return AnalysisResponse(
+        match_score=match_score,
+        resume_skills=analysis_result["resume_skills"],
+        jd_skills=analysis_result["jd_skills"],
+        missing_skills=missing_skills,
+        matched_skills=matched_skills,
+        strengths=analysis_result["strengths"],
+        suggestions=analysis_result["suggestions"],
+        summary=analysis_result["summary"]
+    )
+
+
+async def run_analysis(
+    resume_text: str,
+    job_description: str,
+    job: Optional[JobProfile],
+    use_cache: bool
+) -> AnalysisResponse:
+    """
+    Run the analysis pipeline on extracted resume text
+    
+    Args:
+        resume_text: Extracted resume text
+        job_description: Job description text
+        job: Registered job, whose precomputed artifacts are used when given
+        use_cache: Reuse a cached LLM analysis for identical requests
+        
+    Returns:
+        Analysis results with match score
+    """
+    jd_skills = job.skills if job is not None else None
+    
+    # Process resume with RAG and retrieve relevant context
+    print("Processing resume with RAG...")
+    rag_service = get_rag_service()
+    cleaned_resume, ranked_chunks = await get_executors().run_embedding(
+        rag_service.process_and_retrieve, resume_text, job_description, 5,
+        job.query_embeddings if job is not None else None
+    )
+    
+    # Match skills locally
+    with stage("skill_extraction"):
+        skills = await get_executors().run_embedding(
+            extract_skills, resume_text, job_description, jd_skills
+        )
+    
+    # Pack the resume and non-duplicate retrieved chunks into the token budget
+    with stage("context_packing"):
+        enhanced_resume = get_context_builder().build_resume_context(cleaned_resume, ranked_chunks)
+    
+    # Analyze with LLM
+    print("Analyzing with LLM...")
+    llm_service = get_llm_service()
+    analysis_result = await llm_service.analyze_resume_vs_job_async(
+        enhanced_resume, job_description, use_cache=use_cache, skills=skills, jd_skills=jd_skills
+    )
+    
+    # Build response
+    with stage("response_build"):
+        return await build_analysis_response(analysis_result, skills)
+
+
+async def analyze_pdf(
+    pdf_content: PdfUpload,
+    job_description: str,
+    job: Optional[JobProfile],
+    use_cache: bool
+) -> AnalysisResponse:
+    """
+    Extract and analyze a resume, coalescing identical concurrent requests
+    
+    Requests with the same resume bytes, job description and use_cache
+    that arrive while one is running (double clicks, client retries) await
+    that request's result instead of repeating PDF parsing, embedding and
+    the LLM call.
+    
+    Args:
+        pdf_content: Uploaded PDF
+        job_description: Job description text
+        job: Registered job, whose precomputed artifacts are used when given
+        use_cache: Reuse a cached LLM analysis for identical requests
+        
+    Returns:
+        Analysis results with match score
+    """
+    key = ":".join([
+        pdf_content.digest,
+        hashlib.sha256(job_description.encode("utf-8")).hexdigest(),
+        str(use_cache)
+    ])
+    
+    async def analyze() -> AnalysisResponse:
+        resume_text = await resume_text_from_pdf(pdf_content)
+        return await run_analysis(resume_text, job_description, job, use_cache)
+    
+    return await analysis_flights.do(key, analyze)
+
+
+async def run_analysis_task(payload: Dict[str, Any], pdf_content: bytes) -> Dict[str, Any]:
+    """
+    Task queue handler for POST /analyze/async
+    
+    Client errors (unreadable PDF, deleted job) fail the task at once;
+    anything else, such as LLM rate limits or timeouts, is retried.
+    
+    Args:
+        payload: Form fields stored at submission
+        pdf_content: Uploaded PDF bytes
+        
+    Returns:
+        AnalysisResponse as a dict
+    """
+    with start_trace() as trace:
+        try:
+            job_description, job = await resolve_job(payload["job_description"], payload["job_id"])
+            response = await analyze_pdf(
+                PdfUpload.from_bytes(pdf_content), job_description, job, payload["use_cache"]
+            )
+        except HTTPException as e:
+            if e.status_code >= 500:
+                raise
+            raise PermanentTaskError(e.detail)
+        print(f"Task analysis complete. Match score: {response.match_score}%")
+        print(f"Stage timings: {json.dumps(trace.as_dict())}")
+    return response.model_dump()
+
+
+async def start_task_workers():
+    """Start draining the task queue once the services have loaded"""
+    await app.state.warmup_task
+    if warmup.has_failed():
+        print("Task workers not started: a required service failed to load")
+        return
+    app.state.task_workers.start()
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start loading services in the background so the server accepts connections immediately"""
+    # A remote embedding pool without a secret is refused before anything starts
+    if os.getenv("EMBEDDING_WORKERS_ADDRESS"):
+        require_authkey()
+    
+    print("Warming up services in the background...")
+    app.state.warmup_task = asyncio.create_task(warmup.run(get_executors().run_embedding))
+    
+    task_queue = get_task_queue()
+    TASKS_QUEUED.set_function(lambda: task_queue.counts()["queued"])
+    app.state.task_workers = TaskWorkers(task_queue, run_analysis_task, concurrency=TASK_WORKERS)
+    if TASK_WORKERS > 0:
+        app.state.task_workers_task = asyncio.create_task(start_task_workers())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools and HTTP connections on shutdown"""
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    task_workers_task = getattr(app.state, "task_workers_task", None)
+    if task_workers_task is not None and not task_workers_task.done():
+        task_workers_task.cancel()
+    # Analyses in progress go back to the queue for the next start
+    await app.state.task_workers.stop()
+    get_executors().shutdown()
+    if warmup.is_ready("embedding"):
+        get_embedding_service().close()
+    if warmup.is_ready("llm"):
+        await get_llm_service().aclose()
 
 
 @app.get("/")
@@ -101,21 +577,57 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
-    return {
-        "status": "healthy",
-        "services": {
-            "embedding": "ready",
-            "rag": "ready",
-            "llm": "ready"
+    """Liveness check: the process is up and serving requests"""
+    return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 200 once every required service has loaded, 503 before"""
+    if warmup.is_ready():
+        status = "ready"
+    else:
+        status = "failed" if warmup.has_failed() else "starting"
+    return JSONResponse(
+        status_code=200 if status == "ready" else 503,
+        content={
+            "status": status,
+            "services": warmup.as_dict()
         }
+    )
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Cache hit/miss counters (services that have not loaded yet are left out)"""
+    stats = {
+        "pdf_text": get_text_cache().stats_dict()
     }
+    # Like the Prometheus collector, never load a service just to read its cache
+    if warmup.is_ready("embedding"):
+        embedding_cache = get_embedding_service().cache
+        if embedding_cache is not None:
+            stats["embeddings"] = embedding_cache.stats_dict()
+    if warmup.is_ready("llm"):
+        llm_cache = get_llm_service().cache
+        if llm_cache is not None:
+            stats["llm"] = llm_cache.stats_dict()
+    return stats
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage latencies, LLM tokens, cache hit rates, in-flight gauges"""
+    # Collecting reads the task queue's sqlite counts, so it runs off the event loop
+    return Response(await asyncio.to_thread(generate_latest), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_resume(
     resume: UploadFile = File(..., description="Resume PDF file"),
-    job_description: str = Form(..., description="Job description text")
+    job_description: Optional[str] = Form(None, description="Job description text"),
+    job_id: Optional[str] = Form(None, description="ID of a job registered with POST /jobs"),
+    use_cache: bool = Form(True, description="Reuse cached LLM analyses")
 ):
     """
     Analyze resume against job description
@@ -123,89 +635,443 @@ async def analyze_resume(
     Args:
         resume: Uploaded PDF file
         job_description: Job description text
+        job_id: Registered job to use instead of job_description
+        use_cache: Reuse a cached LLM analysis for identical requests
         
     Returns:
         Analysis results with match score, skills, and suggestions
     """
-    try:
-        # Validate inputs
-        if not resume.filename.lower().endswith('.pdf'):
+    with start_trace() as trace:
+        try:
+            # Validate inputs
+            job_description, job = await resolve_job(job_description, job_id)
+            
+            print("Extracting text from PDF...")
+            pdf_content = await read_resume_upload(resume)
+            response = await analyze_pdf(pdf_content, job_description, job, use_cache)
+            
+            print(f"Analysis complete. Match score: {response.match_score}%")
+            print(f"Stage timings: {json.dumps(trace.as_dict())}")
+            return response
+            
+        except HTTPException:
+            raise
+        except openai.RateLimitError:
             raise HTTPException(
-                status_code=400,
-                detail="Only PDF files are supported"
+                status_code=503,
+                detail="LLM rate limit reached, please retry shortly"
             )
-        
-        if not job_description or len(job_description.strip()) < 10:
+        except asyncio.TimeoutError:
             raise HTTPException(
-                status_code=400,
-                detail="Job description must be at least 10 characters"
+                status_code=504,
+                detail="LLM did not respond within the deadline"
             )
-        
-        # Read PDF file
-        pdf_content = await resume.read()
-        
-        if len(pdf_content) == 0:
+        except Exception as e:
+            print(f"Error during analysis: {str(e)}")
             raise HTTPException(
-                status_code=400,
-                detail="Uploaded file is empty"
+                status_code=500,
+                detail=f"Analysis failed: {str(e)}"
             )
+
+
+@app.post("/analyze/stream")
+async def analyze_resume_stream(
+    resume: UploadFile = File(..., description="Resume PDF file"),
+    job_description: Optional[str] = Form(None, description="Job description text"),
+    job_id: Optional[str] = Form(None, description="ID of a job registered with POST /jobs"),
+    use_cache: bool = Form(True, description="Reuse cached LLM analyses")
+):
+    """
+    Analyze resume against job description, streaming progress as SSE
+    
+    Events: "stage" (extracted, retrieved), "delta" (raw LLM JSON),
+    "item" (a completed list entry such as a skill), then "result" with the
+    same payload as /analyze, or "error".
+    
+    Args:
+        resume: Uploaded PDF file
+        job_description: Job description text
+        job_id: Registered job to use instead of job_description
+        use_cache: Reuse a cached LLM analysis for identical requests
         
-        # Extract text from PDF
-        print("Extracting text from PDF...")
-        resume_text = extract_text_from_pdf(pdf_content)
-        
-        if len(resume_text.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="Resume text is too short or could not be extracted properly"
+    Returns:
+        text/event-stream response
+    """
+    job_description, job = await resolve_job(job_description, job_id)
+    jd_skills = job.skills if job is not None else None
+    resume_text = await read_resume_text(resume)
+    
+    async def events():
+        try:
+            yield sse_event("stage", {"stage": "extracted", "characters": len(resume_text)})
+            
+            cleaned_resume, ranked_chunks = await get_executors().run_embedding(
+                get_rag_service().process_and_retrieve, resume_text, job_description, 5,
+                job.query_embeddings if job is not None else None
             )
+            with stage("context_packing"):
+                enhanced_resume = get_context_builder().build_resume_context(cleaned_resume, ranked_chunks)
+            yield sse_event("stage", {"stage": "retrieved", "context_characters": len(enhanced_resume)})
+            
+            with stage("skill_extraction"):
+                skills = await get_executors().run_embedding(
+                    extract_skills, resume_text, job_description, jd_skills
+                )
+            if skills is not None:
+                yield sse_event("stage", {"stage": "skills"})
+                for field, values in skills.items():
+                    for value in values:
+                        yield sse_event("item", {"field": field, "value": value})
+            
+            parser = JSONListItemParser()
+            # The LLM's matched/missing lists are replaced by semantic matching, so
+            # those items are sent from the final response instead
+            rematched = set() if skills is not None or get_skill_matcher() is None else {
+                "matched_skills", "missing_skills"
+            }
+            
+            async for kind, payload in get_llm_service().stream_analysis(
+                enhanced_resume, job_description, use_cache=use_cache, skills=skills, jd_skills=jd_skills
+            ):
+                if kind == "delta":
+                    yield sse_event("delta", {"text": payload})
+                    for field, item in parser.feed(payload):
+                        if field not in rematched:
+                            yield sse_event("item", {"field": field, "value": item})
+                else:
+                    with stage("response_build"):
+                        response = await build_analysis_response(payload, skills)
+                    for field in sorted(rematched):
+                        for value in getattr(response, field):
+                            yield sse_event("item", {"field": field, "value": value})
+                    yield sse_event("result", response.model_dump())
+        except openai.RateLimitError:
+            yield sse_event("error", {"status_code": 503, "detail": "LLM rate limit reached, please retry shortly"})
+        except asyncio.TimeoutError:
+            yield sse_event("error", {"status_code": 504, "detail": "LLM did not respond within the deadline"})
+        except Exception as e:
+            print(f"Error during streaming analysis: {str(e)}")
+            yield sse_event("error", {"status_code": 500, "detail": f"Analysis failed: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(
+    resumes: List[UploadFile] = File(..., description="Resume PDF files"),
+    job_description: Optional[str] = Form(None, description="Job description text"),
+    job_id: Optional[str] = Form(None, description="ID of a job registered with POST /jobs"),
+    use_cache: bool = Form(True, description="Reuse cached LLM analyses")
+):
+    """
+    Analyze many resumes against one job description
+    
+    The job description is embedded once (or not at all for a registered
+    job), all resume chunks are encoded in large batches and LLM calls fan
+    out under a concurrency limit.
+    
+    Args:
+        resumes: Uploaded PDF files
+        job_description: Job description text
+        job_id: Registered job to use instead of job_description
+        use_cache: Reuse cached LLM analyses for identical requests
         
-        # Process resume with RAG
-        print("Processing resume with RAG...")
-        rag_service = get_rag_service()
-        cleaned_resume = rag_service.process_resume(resume_text)
-        
-        # Retrieve relevant context
-        print("Retrieving relevant context...")
-        relevant_context = rag_service.retrieve_relevant_context(job_description, k=5)
-        
-        # Combine full resume with retrieved context for better analysis
-        enhanced_resume = f"{relevant_context}\n\n{cleaned_resume[:3000]}"
-        
-        # Analyze with LLM
-        print("Analyzing with LLM...")
-        llm_service = get_llm_service()
-        analysis_result = llm_service.analyze_resume_vs_job(enhanced_resume, job_description)
-        
-        # Calculate match score
-        match_score = llm_service.calculate_match_score(
-            analysis_result["matched_skills"],
-            analysis_result["jd_skills"]
+    Returns:
+        Per-resume results plus batch throughput
+    """
+    job_description, job = await resolve_job(job_description, job_id)
+    jd_skills = job.skills if job is not None else None
+    
+    if len(resumes) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_SIZE} resumes can be analyzed per batch"
         )
+    
+    start_time = time.perf_counter()
+    results = [BatchItemResult(filename=resume.filename or "") for resume in resumes]
+    
+    # Extract all PDFs concurrently
+    print(f"Extracting text from {len(resumes)} PDFs...")
+    extracted = await asyncio.gather(
+        *(read_resume_text(resume) for resume in resumes),
+        return_exceptions=True
+    )
+    
+    valid_indices = []
+    for i, outcome in enumerate(extracted):
+        if isinstance(outcome, HTTPException):
+            results[i].error = outcome.detail
+            results[i].status_code = outcome.status_code
+        elif isinstance(outcome, BaseException):
+            results[i].error = str(outcome)
+            results[i].status_code = 500
+        else:
+            valid_indices.append(i)
+    
+    # Embed all chunks in large batches and the job description once
+    print("Processing resumes with RAG...")
+    processed = await get_executors().run_embedding(
+        get_rag_service().process_batch,
+        [extracted[i] for i in valid_indices],
+        job_description,
+        5,
+        EMBEDDING_BATCH_SIZE,
+        job.query_embeddings if job is not None else None
+    )
+    
+    # Fan out LLM calls under a concurrency limit
+    print("Analyzing with LLM...")
+    llm_service = get_llm_service()
+    semaphore = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+    
+    async def score(index: int, cleaned_resume: str, ranked_chunks: List[str]):
+        enhanced_resume = get_context_builder().build_resume_context(cleaned_resume, ranked_chunks)
+        try:
+            with stage("skill_extraction"):
+                skills = await get_executors().run_embedding(
+                    extract_skills, extracted[index], job_description, jd_skills
+                )
+            async with semaphore:
+                analysis_result = await llm_service.analyze_resume_vs_job_async(
+                    enhanced_resume, job_description, use_cache=use_cache, skills=skills, jd_skills=jd_skills
+                )
+            with stage("response_build"):
+                results[index].result = await build_analysis_response(analysis_result, skills)
+        # Same statuses and details as /analyze, so clients can retry just these items
+        except openai.RateLimitError:
+            results[index].status_code = 503
+            results[index].error = "LLM rate limit reached, please retry shortly"
+        except asyncio.TimeoutError:
+            results[index].status_code = 504
+            results[index].error = "LLM did not respond within the deadline"
+        except Exception as e:
+            results[index].status_code = 500
+            results[index].error = f"Analysis failed: {str(e)}"
+    
+    await asyncio.gather(*(
+        score(index, cleaned_resume, ranked_chunks)
+        for index, (cleaned_resume, ranked_chunks) in zip(valid_indices, processed)
+    ))
+    
+    elapsed = time.perf_counter() - start_time
+    succeeded = sum(1 for item in results if item.result is not None)
+    print(f"Batch complete. {succeeded}/{len(results)} resumes in {elapsed:.2f}s")
+    
+    return BatchAnalysisResponse(
+        results=results,
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        elapsed_seconds=round(elapsed, 3),
+        resumes_per_second=round(len(results) / elapsed, 3) if elapsed > 0 else 0.0
+    )
+
+
+@app.post("/analyze/async", response_model=TaskSubmitResponse, status_code=202)
+async def submit_analysis(
+    resume: UploadFile = File(..., description="Resume PDF file"),
+    job_description: Optional[str] = Form(None, description="Job description text"),
+    job_id: Optional[str] = Form(None, description="ID of a job registered with POST /jobs"),
+    use_cache: bool = Form(True, description="Reuse cached LLM analyses")
+):
+    """
+    Queue a resume analysis and return immediately
+    
+    The PDF and form fields are stored in the durable task queue and
+    analyzed by background workers; poll GET /tasks/{task_id} for the result.
+    
+    Args:
+        resume: Uploaded PDF file
+        job_description: Job description text
+        job_id: Registered job to use instead of job_description
+        use_cache: Reuse a cached LLM analysis for identical requests
         
-        # Build response
-        response = AnalysisResponse(
-            match_score=match_score,
-            resume_skills=analysis_result["resume_skills"],
-            jd_skills=analysis_result["jd_skills"],
-            missing_skills=analysis_result["missing_skills"],
-            matched_skills=analysis_result["matched_skills"],
-            strengths=analysis_result["strengths"],
-            suggestions=analysis_result["suggestions"],
-            summary=analysis_result["summary"]
-        )
+    Returns:
+        Task ID to poll
+    """
+    job_description, job = await resolve_job(job_description, job_id)
+    upload = await read_resume_upload(resume)
+    
+    # Bounded by PDF_MAX_BYTES; the queue stores the file in its database
+    pdf_content = await asyncio.to_thread(upload.read_bytes)
+    upload.close()
+    task_id = await app.state.task_workers.submit(
+        {
+            "filename": resume.filename or "",
+            "job_description": job_description if job is None else None,
+            "job_id": job.job_id if job is not None else None,
+            "use_cache": use_cache
+        },
+        pdf_content
+    )
+    return TaskSubmitResponse(task_id=task_id)
+
+
+@app.get("/tasks/{task_id}", response_model=TaskStatusResponse)
+async def get_task(task_id: str, wait: float = 0):
+    """
+    Status of a queued analysis, with its result once it succeeded
+    
+    Args:
+        task_id: ID returned by POST /analyze/async
+        wait: Long-poll up to this many seconds (at most TASK_MAX_WAIT_SECONDS)
+            for the task to finish
         
-        print(f"Analysis complete. Match score: {match_score}%")
-        return response
+    Returns:
+        Task status
+    """
+    task = await app.state.task_workers.wait(task_id, min(max(wait, 0), TASK_MAX_WAIT_SECONDS))
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Unknown task_id {task_id}")
+    
+    payload = task.pop("payload")
+    return TaskStatusResponse(**task, filename=payload["filename"], job_id=payload["job_id"])
+
+
+@app.post("/jobs", response_model=JobResponse)
+async def register_job(request: JobCreateRequest):
+    """
+    Register a job description for repeated analyses
+    
+    Its skills, embedding and section embeddings are computed once here;
+    analyses that pass the returned job_id skip all job description work.
+    Registering the same text again returns the existing job.
+    
+    Args:
+        request: Job description and optional title
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error during analysis: {str(e)}")
+    Returns:
+        Registered job
+    """
+    registry = get_job_registry()
+    executors = get_executors()
+    
+    job = await executors.run_embedding(registry.get, job_id_for(request.job_description))
+    if job is None:
+        skills = None
+        try:
+            if get_skill_extractor() is None:
+                skills = await get_llm_service().extract_job_skills_async(request.job_description)
+        except openai.RateLimitError:
+            raise HTTPException(
+                status_code=503,
+                detail="LLM rate limit reached, please retry shortly"
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504,
+                detail="LLM did not respond within the deadline"
+            )
+        job = await executors.run_embedding(registry.register, request.job_description, request.title, skills)
+        print(f"Registered job {job.job_id} with {len(job.skills)} skills and {len(job.chunks)} sections")
+    
+    return JobResponse(**job.summary())
+
+
+@app.get("/jobs", response_model=JobListResponse)
+async def list_jobs(limit: int = 100):
+    """List registered jobs, most recent first"""
+    jobs = await get_executors().run_embedding(get_job_registry().list_jobs, limit)
+    return JobListResponse(jobs=[JobResponse(**job) for job in jobs])
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get a registered job"""
+    job = await get_executors().run_embedding(get_job_registry().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id {job_id}")
+    return JobResponse(**job.summary())
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Remove a registered job"""
+    deleted = await get_executors().run_embedding(get_job_registry().delete, job_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id {job_id}")
+    return {"job_id": job_id, "deleted": True}
+
+
+@app.post("/candidates", response_model=CandidateIngestResponse)
+async def add_candidates(
+    resumes: List[UploadFile] = File(..., description="Resume PDF files")
+):
+    """
+    Add resumes to the persistent candidate index
+    
+    Args:
+        resumes: Uploaded PDF files
+        
+    Returns:
+        Candidate IDs for the indexed resumes
+    """
+    if len(resumes) > MAX_BATCH_SIZE:
         raise HTTPException(
-            status_code=500,
-            detail=f"Analysis failed: {str(e)}"
+            status_code=400,
+            detail=f"At most {MAX_BATCH_SIZE} resumes can be added per call"
         )
+    
+    rag_service = get_rag_service()
+    candidate_index = get_candidate_index()
+    executors = get_executors()
+    results = []
+    
+    for resume in resumes:
+        item = CandidateIngestResult(filename=resume.filename or "")
+        try:
+            resume_text = await read_resume_text(resume)
+            chunks, embeddings = await executors.run_embedding(
+                rag_service.prepare_chunks, resume_text, EMBEDDING_BATCH_SIZE
+            )
+            item.candidate_id = await executors.run_embedding(
+                candidate_index.add_candidate, item.filename, chunks, embeddings, False
+            )
+            item.chunks = len(chunks)
+        except HTTPException as e:
+            item.error = e.detail
+        except Exception as e:
+            item.error = str(e)
+        results.append(item)
+    
+    await executors.run_embedding(candidate_index.save)
+    
+    return CandidateIngestResponse(
+        results=results,
+        total_candidates=candidate_index.total_candidates
+    )
+
+
+@app.post("/rank", response_model=RankResponse)
+async def rank_candidates(request: RankRequest):
+    """
+    Rank indexed candidates against a job description
+    
+    Args:
+        request: Job description and number of candidates to return
+        
+    Returns:
+        Top-K candidates by best-matching chunk similarity
+    """
+    start_time = time.perf_counter()
+    candidate_index = get_candidate_index()
+    
+    def rank():
+        query_embedding = get_embedding_service().embed_text(request.job_description)
+        return candidate_index.rank(query_embedding, top_k=request.top_k)
+    
+    ranked = await get_executors().run_embedding(rank)
+    
+    return RankResponse(
+        candidates=[RankedCandidate(**candidate) for candidate in ranked],
+        total_candidates=candidate_index.total_candidates,
+        elapsed_ms=round((time.perf_counter() - start_time) * 1000, 2)
+    )
 
 
 @app.exception_handler(Exception)
@@ -0,0 +1,224 @@
+"""
+Prometheus metrics and per-request stage timing
+
+Stages are timed with the stage() context manager. Every span is observed in
+a histogram; when a RequestTrace is active (see start_trace) the span is also
+added to that request's breakdown, including spans recorded in worker threads
+started with a copied context.
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+STAGE_SECONDS = Histogram(
+    "resume_analyzer_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "resume_analyzer_request_seconds",
+    "HTTP request latency until the response starts",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "resume_analyzer_requests_in_flight",
+    "HTTP requests currently being served"
+)
+LLM_CALLS_IN_FLIGHT = Gauge(
+    "resume_analyzer_llm_calls_in_flight",
+    "LLM API calls awaiting a response"
+)
+LLM_RETRIES = Counter(
+    "resume_analyzer_llm_retries_total",
+    "LLM calls retried after a retryable error"
+)
+LLM_TOKENS = Counter(
+    "resume_analyzer_llm_tokens_total",
+    "LLM tokens used",
+    ["kind"]
+)
+IMPORT_SECONDS = Gauge(
+    "resume_analyzer_import_seconds",
+    "Time taken to import a module (main, or a lazily imported dependency)",
+    ["module"]
+)
+WARMUP_SECONDS = Gauge(
+    "resume_analyzer_warmup_seconds",
+    "Time taken to load and warm up a service",
+    ["service"]
+)
+SERVICE_READY = Gauge(
+    "resume_analyzer_service_ready",
+    "1 when a service has finished warming up",
+    ["service"]
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "resume_analyzer_embedding_batch_size",
+    "Texts encoded per embedding model call",
+    buckets=BATCH_SIZE_BUCKETS
+)
+EMBEDDING_BATCH_CALLS = Histogram(
+    "resume_analyzer_embedding_batch_calls",
+    "Encode calls merged into one embedding model call",
+    buckets=BATCH_SIZE_BUCKETS
+)
+EMBEDDING_BATCH_WAIT_SECONDS = Histogram(
+    "resume_analyzer_embedding_batch_wait_seconds",
+    "Time an encode call waited in the micro-batching queue",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+TASK_OUTCOMES = Counter(
+    "resume_analyzer_tasks_total",
+    "Queued analyses by outcome (submitted, succeeded, retried, failed, recovered)",
+    ["outcome"]
+)
+TASK_QUEUE_SECONDS = Histogram(
+    "resume_analyzer_task_queue_seconds",
+    "Time a queued analysis waited before a worker started it",
+    buckets=LATENCY_BUCKETS + (120.0, 300.0, 600.0)
+)
+TASKS_RUNNING = Gauge(
+    "resume_analyzer_tasks_running",
+    "Queued analyses being processed by this process"
+)
+TASKS_QUEUED = Gauge(
+    "resume_analyzer_tasks_queued",
+    "Analyses waiting in the task queue"
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "resume_analyzer_singleflight_calls_total",
+    "Coalesced operations by role: leader ran the work, coalesced shared a leader's result",
+    ["layer", "role"]
+)
+
+_current_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+class RequestTrace:
+    """Stage durations and token usage of one request"""
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        self.tokens: Dict[str, int] = {}
+
+    def add_span(self, stage_name: str, seconds: float):
+        """Accumulate time for a stage (stages may run more than once)"""
+        self.spans[stage_name] = self.spans.get(stage_name, 0.0) + seconds
+
+    def add_tokens(self, kind: str, count: int):
+        """Accumulate LLM token usage"""
+        self.tokens[kind] = self.tokens.get(kind, 0) + count
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Breakdown as a JSON-serializable dict"""
+        return {
+            "spans_ms": {name: round(seconds * 1000, 2) for name, seconds in self.spans.items()},
+            "llm_tokens": dict(self.tokens)
+        }
+
+
+@contextmanager
+def start_trace() -> Iterator[RequestTrace]:
+    """
+    Collect the stage spans of the enclosed request
+
+    Yields:
+        RequestTrace filled in by stage() and record_llm_usage()
+    """
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a pipeline stage
+
+    Args:
+        name: Stage label, e.g. "pdf_parse" or "embedding"
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(name, elapsed)
+
+
+def record_llm_usage(usage: Any):
+    """
+    Count tokens from an OpenAI usage object
+
+    Args:
+        usage: response.usage (None when the API did not report it)
+    """
+    if usage is None:
+        return
+    trace = _current_trace.get()
+    for kind in ("prompt", "completion"):
+        count = getattr(usage, f"{kind}_tokens", None) or 0
+        LLM_TOKENS.labels(kind).inc(count)
+        if trace is not None:
+            trace.add_tokens(kind, count)
+
+
+class CacheCollector:
+    """Exports cache counters at scrape time
+
+    Caches keep their own CacheStats, so they are read when Prometheus
+    scrapes instead of being mirrored into separate metric objects.
+    """
+
+    def __init__(self, caches: Dict[str, Callable[[], Any]]):
+        """
+        Initialize collector
+
+        Args:
+            caches: Cache name to a callable returning the TieredCache (or None)
+        """
+        self.caches = caches
+
+    def collect(self):
+        hits = CounterMetricFamily("resume_analyzer_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("resume_analyzer_cache_misses", "Cache misses", labels=["cache"])
+        hit_rate = GaugeMetricFamily("resume_analyzer_cache_hit_rate", "Cache hit rate", labels=["cache"])
+        entries = GaugeMetricFamily(
+            "resume_analyzer_cache_memory_entries", "Entries in the in-memory tier", labels=["cache"]
+        )
+
+        for name, get_cache in self.caches.items():
+            cache = get_cache()
+            if cache is None:
+                continue
+            stats = cache.stats_dict()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            hit_rate.add_metric([name], stats["hit_rate"])
+            entries.add_metric([name], stats["memory"]["entries"])
+
+        yield from (hits, misses, hit_rate, entries)
+
+
+def register_caches(caches: Dict[str, Callable[[], Any]]):
+    """Register cache counters with the default Prometheus registry"""
+    REGISTRY.register(CacheCollector(caches))
@@ -3,56 +3,204 @@ RAG (Retrieval Augmented Generation) module using FAISS
 """
 import os
 import re
-from typing import List, Tuple
-import faiss
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 import numpy as np
 from embeddings import get_embedding_service
+from lazy_imports import lazy_module
+from metrics import stage
+
+faiss = lazy_module("faiss")
+
+
+# Compiled once; clean_text and the chunker run for every resume
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\-\(\)\:\;]')
+_TOKEN_RE = re.compile(r'\S+')
+_SENTENCE_END_RE = re.compile(r'[.;]\s+')
+_SENTENCE_TERMINATORS = (". ", "; ")
+
+CHUNK_MODES = ("token", "sentence")
+
+
+class Chunk(NamedTuple):
+    """A chunk of text with its [start, end) character span in the source"""
+    text: str
+    start: int
+    end: int
 
 
 class DocumentChunker:
-    """Utility for chunking documents"""
+    """Utility for chunking documents
+    
+    Chunks are computed as character spans into the input string, so no
+    intermediate word lists or re-joined copies are built and every chunk can
+    be traced back to its position in the source text.
+    """
+    
+    def __init__(self, chunk_size: int = 128, overlap: int = 24, mode: str = "sentence"):
+        """
+        Initialize chunker
+        
+        Args:
+            chunk_size: Maximum whitespace-delimited tokens per chunk
+            overlap: Tokens shared by consecutive chunks
+            mode: "token" for fixed token windows, "sentence" to end chunks
+                on sentence boundaries where possible
+        """
+        if mode not in CHUNK_MODES:
+            raise ValueError(f"Unknown chunk mode: {mode}")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.mode = mode
     
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean and normalize text"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # Remove special characters but keep important punctuation
-        text = re.sub(r'[^\w\s\.\,\-\(\)\:\;]', '', text)
+        text = _SPECIAL_CHARS_RE.sub('', text)
         return text.strip()
     
-    @staticmethod
-    def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    def chunk_text(
+        self,
+        text: str,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None
+    ) -> List[str]:
         """
-        Split text into overlapping chunks
+        Split cleaned text into overlapping chunks
         
         Args:
-            text: Input text
-            chunk_size: Maximum characters per chunk
-            overlap: Overlap between chunks
+            text: Text already passed through clean_text
+            chunk_size: Maximum tokens per chunk (defaults to the chunker's)
+            overlap: Overlap in tokens between chunks (defaults to the chunker's)
             
         Returns:
             List of text chunks
         """
-        if not text:
-            return []
+        return [chunk.text for chunk in self.chunk_with_spans(text, chunk_size, overlap)]
+    
+    def chunk_with_spans(
+        self,
+        text: str,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None
+    ) -> List[Chunk]:
+        """
+        Split text into overlapping chunks with their source spans
         
-        text = DocumentChunker.clean_text(text)
-        words = text.split()
+        Args:
+            text: Input text
+            chunk_size: Maximum tokens per chunk (defaults to the chunker's)
+            overlap: Overlap in tokens between chunks (defaults to the chunker's)
+            
+        Returns:
+            List of chunks, where text[chunk.start:chunk.end] == chunk.text
+        """
+        chunk_size = self.chunk_size if chunk_size is None else chunk_size
+        overlap = self.overlap if overlap is None else overlap
         
-        if len(words) <= chunk_size:
-            return [text]
+        starts, ends, single_spaced = self._token_offsets(text)
+        if not len(starts):
+            return []
+        
+        if self.mode == "sentence":
+            boundaries = self._sentence_boundaries(text, starts, single_spaced)
+            windows = self._sentence_windows(boundaries, chunk_size, overlap)
+        else:
+            windows = self._token_windows(len(starts), chunk_size, overlap)
         
         chunks = []
-        start = 0
+        for first, last in windows:
+            start, end = int(starts[first]), int(ends[last - 1])
+            chunks.append(Chunk(text[start:end], start, end))
+        return chunks
+    
+    @staticmethod
+    def _token_offsets(text: str) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Character offsets of every whitespace-delimited token
         
-        while start < len(words):
-            end = start + chunk_size
-            chunk_words = words[start:end]
-            chunks.append(' '.join(chunk_words))
-            start = end - overlap
+        Cleaned text has exactly one space between tokens, so offsets follow
+        from the token lengths with a cumulative sum; other text falls back to
+        a regex scan.
         
-        return chunks
+        Returns:
+            Tuple of (start offsets, end offsets, whether text is single-spaced)
+        """
+        words = text.split()
+        if " ".join(words) == text:
+            lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+            ends = np.cumsum(lengths + 1) - 1
+            return ends - lengths, ends, True
+        
+        spans = np.array([m.span() for m in _TOKEN_RE.finditer(text)], dtype=np.int64).reshape(-1, 2)
+        return spans[:, 0], spans[:, 1], False
+    
+    @staticmethod
+    def _sentence_boundaries(text: str, token_starts: np.ndarray, single_spaced: bool) -> List[int]:
+        """Token indices at which sentences start, ending with the token count"""
+        offsets = []
+        if single_spaced:
+            for terminator in _SENTENCE_TERMINATORS:
+                position = text.find(terminator)
+                while position != -1:
+                    offsets.append(position + len(terminator))
+                    position = text.find(terminator, position + 1)
+            offsets.sort()
+        else:
+            offsets = [match.end() for match in _SENTENCE_END_RE.finditer(text)]
+        
+        boundaries = np.unique(np.searchsorted(token_starts, offsets)).tolist()
+        n_tokens = len(token_starts)
+        if not boundaries or boundaries[0] != 0:
+            boundaries.insert(0, 0)
+        if boundaries[-1] != n_tokens:
+            boundaries.append(n_tokens)
+        return boundaries
+    
+    @staticmethod
+    def _token_windows(n_tokens: int, chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
+        """Fixed windows of token indices [first, last)"""
+        if n_tokens <= chunk_size:
+            return [(0, n_tokens)]
+        step = chunk_size - overlap
+        windows = []
+        for first in range(0, n_tokens, step):
+            last = min(first + chunk_size, n_tokens)
+            windows.append((first, last))
+            if last == n_tokens:
+                break
+        return windows
+    
+    @staticmethod
+    def _sentence_windows(boundaries: List[int], chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
+        """Windows of token indices [first, last) that end on sentence boundaries"""
+        n_tokens = boundaries[-1]
+        if n_tokens <= chunk_size:
+            return [(0, n_tokens)]
+        
+        windows = []
+        first = 0
+        while first < n_tokens:
+            # Furthest sentence boundary that keeps the window within budget
+            last = boundaries[bisect.bisect_right(boundaries, first + chunk_size) - 1]
+            if last <= first:
+                # A single sentence longer than the window falls back to tokens
+                last = min(first + chunk_size, n_tokens)
+            windows.append((first, last))
+            if last == n_tokens:
+                break
+            # Restart at the earliest sentence that starts within the overlap
+            restart = boundaries[bisect.bisect_left(boundaries, max(last - overlap, first + 1))]
+            first = restart if restart < last else last
+        return windows
 
 
 class VectorStore:
@@ -82,15 +230,28 @@ class VectorStore:
         if not documents:
             return
         
-        self.documents.extend(documents)
-        
         # Generate embeddings
-        embeddings = self.embedding_service.embed_documents(documents)
+        with stage("embedding"):
+            embeddings = self.embedding_service.embed_documents(documents)
+        self.add_embeddings(documents, embeddings)
+    
+    def add_embeddings(self, documents: List[str], embeddings: np.ndarray):
+        """
+        Add documents whose embeddings were computed elsewhere
         
-        if embeddings.size > 0:
-            # Add to FAISS index
-            self.index.add(embeddings.astype('float32'))
-            print(f"Added {len(documents)} documents to vector store")
+        Args:
+            documents: List of document chunks
+            embeddings: Array of shape (len(documents), dimension)
+        """
+        if not documents or embeddings.size == 0:
+            return
+        
+        self.documents.extend(documents)
+        
+        # Add to FAISS index
+        with stage("faiss_add"):
+            self.index.add(np.ascontiguousarray(embeddings, dtype='float32'))
+        print(f"Added {len(documents)} documents to vector store")
     
     def search(self, query: str, k: int = 3) -> List[Tuple[str, float]]:
         """
@@ -107,37 +268,69 @@ class VectorStore:
             return []
         
         # Generate query embedding
-        query_embedding = self.embedding_service.embed_text(query)
-        query_embedding = query_embedding.reshape(1, -1).astype('float32')
+        with stage("embedding"):
+            query_embedding = self.embedding_service.embed_text(query)
+        return self.search_by_embedding(query_embedding, k=k)
+    
+    def search_by_embedding(self, query_embedding: np.ndarray, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Search for similar documents with precomputed query embeddings
+        
+        Args:
+            query_embedding: Query embedding vector, or a (n_queries, dimension)
+                array; each document is ranked by its closest query
+            k: Number of results to return
+            
+        Returns:
+            List of (document, distance) tuples
+        """
+        if not self.documents or self.index.ntotal == 0:
+            return []
+        
+        queries = np.ascontiguousarray(query_embedding.reshape(-1, self.dimension), dtype='float32')
         
         # Search
         k = min(k, len(self.documents))
-        distances, indices = self.index.search(query_embedding, k)
+        with stage("faiss_search"):
+            distances, indices = self.index.search(queries, k)
         
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx < len(self.documents):
-                results.append((self.documents[idx], float(dist)))
+        if len(queries) == 1:
+            return [
+                (self.documents[idx], float(dist))
+                for dist, idx in zip(distances[0], indices[0])
+                if 0 <= idx < len(self.documents)
+            ]
         
-        return results
+        best: Dict[int, float] = {}
+        for dist, idx in zip(distances.ravel(), indices.ravel()):
+            if 0 <= idx < len(self.documents) and dist < best.get(idx, np.inf):
+                best[idx] = float(dist)
+        ranked = sorted(best.items(), key=lambda item: item[1])[:k]
+        return [(self.documents[idx], dist) for idx, dist in ranked]
     
     def clear(self):
         """Clear all documents and reset index"""
         self.documents = []
-        self._initialize_index()
+        self.index.reset()
 
 
-class RAGService:
-    """Main RAG service for resume analysis"""
+class RetrievalContext:
+    """Per-request retrieval context backed by its own vector store"""
     
-    def __init__(self):
-        """Initialize RAG service"""
-        self.vector_store = VectorStore()
-        self.chunker = DocumentChunker()
+    def __init__(self, vector_store: VectorStore, chunker: DocumentChunker):
+        """
+        Initialize retrieval context
+        
+        Args:
+            vector_store: Vector store owned by this context
+            chunker: Shared document chunker
+        """
+        self.vector_store = vector_store
+        self.chunker = chunker
     
     def process_resume(self, resume_text: str) -> str:
         """
-        Process resume and add to vector store
+        Process resume and add to this context's vector store
         
         Args:
             resume_text: Raw resume text
@@ -146,17 +339,40 @@ class RAGService:
             Cleaned resume text
         """
         # Clean text
-        cleaned_text = self.chunker.clean_text(resume_text)
+        with stage("cleaning"):
+            cleaned_text = self.chunker.clean_text(resume_text)
         
         # Chunk text
-        chunks = self.chunker.chunk_text(cleaned_text, chunk_size=300, overlap=50)
+        with stage("chunking"):
+            chunks = self.chunker.chunk_text(cleaned_text)
         
-        # Clear previous data and add new chunks
-        self.vector_store.clear()
         self.vector_store.add_documents(chunks)
         
         return cleaned_text
     
+    def add_chunks(self, chunks: List[str], embeddings: np.ndarray):
+        """
+        Add pre-embedded resume chunks to this context's vector store
+        
+        Args:
+            chunks: Resume chunks
+            embeddings: Embeddings aligned with chunks
+        """
+        self.vector_store.add_embeddings(chunks, embeddings)
+    
+    def retrieve_chunks(self, job_description: str, k: int = 5) -> List[str]:
+        """
+        Retrieve relevant resume sections based on job description
+        
+        Args:
+            job_description: Job description text
+            k: Number of chunks to retrieve
+            
+        Returns:
+            Chunks ordered by relevance, most relevant first
+        """
+        return [doc for doc, _ in self.vector_store.search(job_description, k=k)]
+    
     def retrieve_relevant_context(self, job_description: str, k: int = 5) -> str:
         """
         Retrieve relevant resume sections based on job description
@@ -168,23 +384,186 @@ class RAGService:
         Returns:
             Concatenated relevant context
         """
-        results = self.vector_store.search(job_description, k=k)
+        return " ".join(self.retrieve_chunks(job_description, k=k))
+    
+    def retrieve_by_embedding(self, query_embedding: np.ndarray, k: int = 5) -> List[str]:
+        """
+        Retrieve relevant resume sections for a precomputed query embedding
+        
+        Args:
+            query_embedding: Job description embedding, or one row per
+                job description section
+            k: Number of chunks to retrieve
+            
+        Returns:
+            Chunks ordered by relevance, most relevant first
+        """
+        return [doc for doc, _ in self.vector_store.search_by_embedding(query_embedding, k=k)]
+
+
+class RAGService:
+    """Main RAG service for resume analysis
+    
+    Each analysis gets its own RetrievalContext. Vector stores are pooled and
+    only the embedding model is shared, so concurrent requests never see each
+    other's chunks.
+    """
+    
+    def __init__(self, pool_size: int = 8, chunker: Optional[DocumentChunker] = None):
+        """
+        Initialize RAG service
+        
+        Args:
+            pool_size: Maximum number of idle vector stores kept for reuse
+            chunker: Document chunker (defaults to sentence windows of 128 tokens)
+        """
+        self.chunker = chunker or DocumentChunker()
+        self.pool_size = pool_size
+        self._idle_stores: List[VectorStore] = []
+        self._lock = threading.Lock()
+    
+    def _acquire_store(self) -> VectorStore:
+        """Take an idle vector store from the pool or create a new one"""
+        with self._lock:
+            if self._idle_stores:
+                return self._idle_stores.pop()
+        return VectorStore()
+    
+    def _release_store(self, store: VectorStore):
+        """Reset a vector store and return it to the pool"""
+        store.clear()
+        with self._lock:
+            if len(self._idle_stores) < self.pool_size:
+                self._idle_stores.append(store)
+    
+    @contextmanager
+    def context(self) -> Iterator[RetrievalContext]:
+        """
+        Provide an isolated retrieval context for one analysis
+        
+        Yields:
+            RetrievalContext whose vector store is released on exit
+        """
+        store = self._acquire_store()
+        try:
+            yield RetrievalContext(store, self.chunker)
+        finally:
+            self._release_store(store)
+    
+    def process_and_retrieve(
+        self,
+        resume_text: str,
+        job_description: str,
+        k: int = 5,
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Index a resume and retrieve context for a job description
+        
+        Args:
+            resume_text: Raw resume text
+            job_description: Job description text
+            k: Number of chunks to retrieve
+            query_embeddings: Precomputed job description embeddings (the
+                job description is not embedded when given)
+            
+        Returns:
+            Tuple of (cleaned resume text, chunks ranked by relevance)
+        """
+        with self.context() as ctx:
+            cleaned_text = ctx.process_resume(resume_text)
+            if query_embeddings is not None:
+                ranked_chunks = ctx.retrieve_by_embedding(query_embeddings, k=k)
+            else:
+                ranked_chunks = ctx.retrieve_chunks(job_description, k=k)
+        return cleaned_text, ranked_chunks
+    
+    def prepare_chunks(self, resume_text: str, batch_size: int = 64) -> Tuple[List[str], np.ndarray]:
+        """
+        Clean, chunk and embed a resume without indexing it
+        
+        Args:
+            resume_text: Raw resume text
+            batch_size: Number of chunks encoded per forward pass
+            
+        Returns:
+            Tuple of (chunks, embeddings)
+        """
+        cleaned_text = self.chunker.clean_text(resume_text)
+        chunks = self.chunker.chunk_text(cleaned_text)
+        embeddings = get_embedding_service().embed_documents(chunks, batch_size=batch_size)
+        return chunks, embeddings
+    
+    def process_batch(
+        self,
+        resume_texts: List[str],
+        job_description: str,
+        k: int = 5,
+        batch_size: int = 64,
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> List[Tuple[str, List[str]]]:
+        """
+        Index many resumes and retrieve context for one job description
+        
+        The job description is embedded once and all resume chunks are
+        encoded together in large batches.
+        
+        Args:
+            resume_texts: Raw resume texts
+            job_description: Job description text
+            k: Number of chunks to retrieve per resume
+            batch_size: Number of chunks encoded per forward pass
+            query_embeddings: Precomputed job description embeddings
+            
+        Returns:
+            List of (cleaned resume text, chunks ranked by relevance), in input order
+        """
+        embedding_service = get_embedding_service()
         
-        if not results:
-            return ""
+        with stage("cleaning"):
+            cleaned_texts = [self.chunker.clean_text(text) for text in resume_texts]
+        with stage("chunking"):
+            chunk_lists = [
+                self.chunker.chunk_text(text)
+                for text in cleaned_texts
+            ]
         
-        # Combine top results
-        context_chunks = [doc for doc, _ in results]
-        return " ".join(context_chunks)
+        all_chunks = [chunk for chunks in chunk_lists for chunk in chunks]
+        with stage("embedding"):
+            all_embeddings = embedding_service.embed_documents(all_chunks, batch_size=batch_size)
+            if query_embeddings is None:
+                query_embeddings = embedding_service.embed_text(job_description)
+        
+        results = []
+        offset = 0
+        for cleaned_text, chunks in zip(cleaned_texts, chunk_lists):
+            embeddings = all_embeddings[offset:offset + len(chunks)]
+            offset += len(chunks)
+            with self.context() as ctx:
+                ctx.add_chunks(chunks, embeddings)
+                ranked_chunks = ctx.retrieve_by_embedding(query_embeddings, k=k)
+            results.append((cleaned_text, ranked_chunks))
+        
+        return results
 
 
 # Global instance
 _rag_service = None
+_rag_service_lock = threading.Lock()
 
 
 def get_rag_service() -> RAGService:
     """Get or create global RAG service instance"""
     global _rag_service
     if _rag_service is None:
-        _rag_service = RAGService()
+        # Warmup and an early request may race to create the service
+        with _rag_service_lock:
+            if _rag_service is None:
+                pool_size = int(os.getenv("RAG_CONTEXT_POOL_SIZE", "8"))
+                chunker = DocumentChunker(
+                    chunk_size=int(os.getenv("RAG_CHUNK_SIZE", "128")),
+                    overlap=int(os.getenv("RAG_CHUNK_OVERLAP", "24")),
+                    mode=os.getenv("RAG_CHUNK_MODE", "sentence")
+                )
+                _rag_service = RAGService(pool_size=pool_size, chunker=chunker)
     return _rag_service
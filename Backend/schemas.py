@@ -48,3 +48,98 @@ class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
     status_code: int = 400
+
+
+class BatchItemResult(BaseModel):
+    """Result for a single resume in a batch analysis"""
+    filename: str
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = Field(
+        None, description="Status /analyze would return for this resume's error (503/504 are worth retrying)"
+    )
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Response model for batch resume analysis"""
+    results: List[BatchItemResult] = Field(default_factory=list)
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    resumes_per_second: float = Field(0.0, description="Batch throughput")
+
+
+class CandidateIngestResult(BaseModel):
+    """Result of adding one resume to the candidate index"""
+    filename: str
+    candidate_id: Optional[str] = None
+    chunks: int = 0
+    error: Optional[str] = None
+
+
+class CandidateIngestResponse(BaseModel):
+    """Response model for candidate ingestion"""
+    results: List[CandidateIngestResult] = Field(default_factory=list)
+    total_candidates: int = 0
+
+
+class RankRequest(BaseModel):
+    """Request model for ranking indexed candidates"""
+    job_description: str = Field(..., min_length=10, description="Job description text")
+    top_k: int = Field(10, ge=1, le=500, description="Number of candidates to return")
+
+
+class RankedCandidate(BaseModel):
+    """Single ranked candidate"""
+    candidate_id: str
+    name: str
+    score: float = Field(..., description="Cosine similarity of the best-matching chunk")
+    best_chunk: str = ""
+
+
+class RankResponse(BaseModel):
+    """Response model for candidate ranking"""
+    candidates: List[RankedCandidate] = Field(default_factory=list)
+    total_candidates: int = 0
+    elapsed_ms: float = 0.0
+
+
+class JobCreateRequest(BaseModel):
+    """Request model for registering a job description"""
+    job_description: str = Field(..., min_length=10, description="Job description text")
+    title: str = Field("", description="Display title")
+
+
+class JobResponse(BaseModel):
+    """A registered job description"""
+    job_id: str
+    title: str = ""
+    skills: List[str] = Field(default_factory=list, description="Skills extracted at registration")
+    sections: int = Field(0, description="Job description sections embedded for retrieval")
+    created_at: float = 0.0
+
+
+class JobListResponse(BaseModel):
+    """Response model for listing registered jobs"""
+    jobs: List[JobResponse] = Field(default_factory=list)
+
+
+class TaskSubmitResponse(BaseModel):
+    """Response model for a queued analysis"""
+    task_id: str
+    status: str = "queued"
+
+
+class TaskStatusResponse(BaseModel):
+    """Status of a queued analysis"""
+    task_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    filename: str = ""
+    job_id: Optional[str] = None
+    attempts: int = Field(0, description="Attempts started so far")
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = Field(None, description="Final error, or the last attempt's error while retrying")
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
@@ -0,0 +1,145 @@
+"""
+Coalescing of identical concurrent calls ("single flight")
+
+The first caller for a key runs the work; callers arriving with the same key
+while it is in flight wait for that result instead of repeating the work.
+Nothing is kept once the call finishes, so this complements the caches: it
+covers the window in which a duplicate request would otherwise miss a cache
+entry that is still being computed.
+
+- SingleFlight: coroutines on the event loop (whole analyses, LLM calls)
+- ThreadSingleFlight: blocking code in worker threads (embedding batches)
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+from metrics import SINGLEFLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces identical concurrent coroutine calls on one event loop"""
+
+    def __init__(self, layer: str):
+        """
+        Initialize group
+
+        Args:
+            layer: Label reported in the singleflight metrics
+        """
+        self.layer = layer
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn once per key among concurrent callers
+
+        The work runs in its own task, so a caller that is cancelled (e.g. a
+        disconnected client) does not cancel it for the others.
+
+        Args:
+            key: Identity of the work, e.g. a hash of all its inputs
+            fn: Coroutine function doing the work
+
+        Returns:
+            Result of fn (exceptions are raised to every caller)
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            SINGLEFLIGHT_CALLS.labels(self.layer, "leader").inc()
+        else:
+            SINGLEFLIGHT_CALLS.labels(self.layer, "coalesced").inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        """Remove a finished call so later callers start fresh work"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved here so an error nobody awaited is not logged as unhandled
+            task.exception()
+
+
+class ThreadSingleFlight:
+    """Coalesces identical concurrent calls made from several threads"""
+
+    def __init__(self, layer: str):
+        """
+        Initialize group
+
+        Args:
+            layer: Label reported in the singleflight metrics
+        """
+        self.layer = layer
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn once per key among concurrent callers"""
+        return self.do_many([key], lambda keys: [fn()])[0]
+
+    def do_many(self, keys: Sequence[str], fn: Callable[[List[str]], Sequence[Any]]) -> List[Any]:
+        """
+        Compute many keys, sharing work with other threads
+
+        fn is called once with the keys no other thread is computing (in
+        one batch); keys already in flight elsewhere are waited for.
+
+        Args:
+            keys: Keys to compute (duplicates allowed)
+            fn: Computes a list of keys, returning one result per key
+
+        Returns:
+            One result per key, in input order
+        """
+        owned: List[str] = []
+        waiting: Dict[str, Future] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                future = self._calls.get(key)
+                if future is None:
+                    self._calls[key] = Future()
+                    owned.append(key)
+                else:
+                    waiting[key] = future
+
+        if owned:
+            SINGLEFLIGHT_CALLS.labels(self.layer, "leader").inc(len(owned))
+        if waiting:
+            SINGLEFLIGHT_CALLS.labels(self.layer, "coalesced").inc(len(waiting))
+
+        results: Dict[str, Any] = {}
+        if owned:
+            # Our own keys are computed before waiting on others, so two
+            # threads waiting on each other's keys cannot deadlock
+            try:
+                values = fn(owned)
+            except BaseException as e:
+                self._resolve(owned, error=e)
+                raise
+            results.update(zip(owned, values))
+            self._resolve(owned, results=results)
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+        return [results[key] for key in keys]
+
+    def _resolve(
+        self,
+        keys: List[str],
+        results: Optional[Dict[str, Any]] = None,
+        error: Optional[BaseException] = None
+    ):
+        """Publish results (or an error) of owned keys and stop tracking them"""
+        with self._lock:
+            futures = [self._calls.pop(key) for key in keys]
+        for key, future in zip(keys, futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[key])
@@ -0,0 +1,132 @@
+"""
+Vectorized semantic skill matching for skills extracted by the LLM
+"""
+import os
+from typing import Any, Dict, FrozenSet, List, Optional
+import numpy as np
+from embeddings import EmbeddingService, get_embedding_service
+from skills import DEFAULT_TAXONOMY_PATH, SkillExtractor
+
+
+class SemanticSkillMatcher:
+    """Matches free-text JD skills to resume skills by embedding cosine similarity
+
+    JD skills the taxonomy knows are matched by canonical name: synonyms
+    ("JS", "JavaScript") match and distinct skills ("Java", "JavaScript",
+    "React", "React Native") never do, however close their embeddings are.
+    The other JD skills and the resume skills are embedded in one batch
+    (through the embedding cache, so repeated skills cost a lookup) and
+    compared with a single matmul over normalized vectors.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        threshold: float = 0.8,
+        extractor: Optional[SkillExtractor] = None
+    ):
+        """
+        Initialize matcher
+
+        Args:
+            embedding_service: Service used to embed skill names
+            threshold: Minimum cosine similarity for a JD skill to count as matched
+            extractor: Taxonomy used to canonicalize skill names (embeddings only when None)
+        """
+        self.embedding_service = embedding_service
+        self.threshold = threshold
+        self.extractor = extractor
+
+    def match(self, resume_skills: List[str], jd_skills: List[str]) -> Dict[str, Any]:
+        """
+        Match JD skills against resume skills
+
+        Args:
+            resume_skills: Skills found in the resume
+            jd_skills: Skills required by the job description
+
+        Returns:
+            Dict with matched_skills, missing_skills and match_score (0-100)
+        """
+        resume_skills = [s for s in resume_skills if s and s.strip()]
+        jd_skills = [s for s in jd_skills if s and s.strip()]
+
+        if not jd_skills:
+            return {"matched_skills": [], "missing_skills": [], "match_score": 0.0}
+        if not resume_skills:
+            return {"matched_skills": [], "missing_skills": list(jd_skills), "match_score": 0.0}
+
+        jd_canonical = [self._canonical(s) for s in jd_skills]
+        resume_canonical = [self._canonical(s) for s in resume_skills]
+        similarity = np.zeros((len(jd_skills), len(resume_skills)), dtype=np.float32)
+
+        # Taxonomy skills are matched by name; only the others are embedded
+        free = [j for j, required in enumerate(jd_canonical) if not required]
+        if free:
+            similarity[free] = self.similarity_matrix([jd_skills[j] for j in free], resume_skills)
+
+        for j, required in enumerate(jd_canonical):
+            for i, offered in enumerate(resume_canonical):
+                if required and offered and required <= offered:
+                    similarity[j, i] = 1.0
+
+        # Identical names (ignoring case) always match fully
+        resume_lower = {s.lower(): i for i, s in enumerate(resume_skills)}
+        for j, skill in enumerate(jd_skills):
+            if skill.lower() in resume_lower:
+                similarity[j, resume_lower[skill.lower()]] = 1.0
+
+        best = similarity.max(axis=1)
+        matched_mask = best >= self.threshold
+        credit = np.where(matched_mask, np.clip(best, 0.0, 1.0), 0.0)
+        score = float(credit.mean()) * 100
+
+        return {
+            "matched_skills": [s for s, m in zip(jd_skills, matched_mask) if m],
+            "missing_skills": [s for s, m in zip(jd_skills, matched_mask) if not m],
+            "match_score": round(score, 2)
+        }
+
+    def _canonical(self, skill: str) -> FrozenSet[str]:
+        """Taxonomy skills named in a skill string (empty when unknown)"""
+        if self.extractor is None:
+            return frozenset()
+        return frozenset(self.extractor.extract(skill))
+
+    def similarity_matrix(self, jd_skills: List[str], resume_skills: List[str]) -> np.ndarray:
+        """
+        Cosine similarity of every JD skill to every resume skill
+
+        Args:
+            jd_skills: Non-empty JD skill names
+            resume_skills: Non-empty resume skill names
+
+        Returns:
+            Array of shape (len(jd_skills), len(resume_skills))
+        """
+        embeddings = self.embedding_service.embed_documents(jd_skills + resume_skills)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+
+        jd_vectors = embeddings[:len(jd_skills)]
+        resume_vectors = embeddings[len(jd_skills):]
+        return jd_vectors @ resume_vectors.T
+
+
+# Global instance
+_skill_matcher = None
+
+
+def get_skill_matcher() -> Optional[SemanticSkillMatcher]:
+    """Get or create global semantic matcher (None when exact matching is configured)"""
+    global _skill_matcher
+    if os.getenv("SKILL_MATCHING", "semantic").lower() != "semantic":
+        return None
+    if _skill_matcher is None:
+        _skill_matcher = SemanticSkillMatcher(
+            get_embedding_service(),
+            threshold=float(os.getenv("SKILL_MATCH_THRESHOLD", "0.8")),
+            extractor=SkillExtractor.from_file(os.getenv("SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH))
+        )
+    return _skill_matcher
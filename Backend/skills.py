@@ -0,0 +1,142 @@
+"""
+Local deterministic skill extraction using a taxonomy and a token trie
+"""
+import os
+import re
+import json
+from typing import Dict, List, Optional
+
+# Keeps "c++", "c#" and splits "node.js", "ci/cd" and "scikit-learn" into tokens
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills.json")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used on both the taxonomy and documents"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SkillExtractor:
+    """Multi-pattern skill matcher over a compiled token trie
+
+    Each taxonomy entry has a canonical name and aliases; every alias is
+    tokenized and inserted into the trie, so one left-to-right pass with
+    longest-match finds all skills and normalizes synonyms.
+    """
+
+    _END = "\0"
+
+    def __init__(self, taxonomy: List[Dict]):
+        """
+        Build the trie from a taxonomy
+
+        Args:
+            taxonomy: List of {"name", "category", "aliases", "match_name"} entries
+        """
+        self.categories: Dict[str, str] = {}
+        self._trie: Dict = {}
+
+        for entry in taxonomy:
+            name = entry["name"]
+            self.categories[name] = entry.get("category", "")
+            patterns = list(entry.get("aliases", []))
+            if entry.get("match_name", True):
+                patterns.append(name)
+            for pattern in patterns:
+                tokens = tokenize(pattern)
+                if tokens:
+                    self._insert(tokens, name)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillExtractor":
+        """Load a taxonomy JSON file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _insert(self, tokens: List[str], name: str):
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[self._END] = name
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Find skills mentioned in text
+
+        Args:
+            text: Resume or job description text
+
+        Returns:
+            Canonical skill names in order of first appearance
+        """
+        tokens = tokenize(text)
+        found: Dict[str, None] = {}
+        i = 0
+
+        while i < len(tokens):
+            node = self._trie
+            match, match_end = None, i
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if self._END in node:
+                    match, match_end = node[self._END], j
+            if match is not None:
+                found.setdefault(match, None)
+                i = match_end
+            else:
+                i += 1
+
+        return list(found)
+
+    def match(self, resume_text: str, job_description: str) -> Dict[str, List[str]]:
+        """
+        Extract and compare skills of a resume and a job description
+
+        Args:
+            resume_text: Resume text
+            job_description: Job description text
+
+        Returns:
+            Dict with resume_skills, jd_skills, matched_skills and missing_skills
+        """
+        return self.match_extracted(self.extract(resume_text), self.extract(job_description))
+
+    @staticmethod
+    def match_extracted(resume_skills: List[str], jd_skills: List[str]) -> Dict[str, List[str]]:
+        """
+        Compare skill lists that were already extracted
+
+        Args:
+            resume_skills: Skills found in the resume
+            jd_skills: Skills required by the job description
+
+        Returns:
+            Dict with resume_skills, jd_skills, matched_skills and missing_skills
+        """
+        resume_set = set(resume_skills)
+
+        return {
+            "resume_skills": resume_skills,
+            "jd_skills": jd_skills,
+            "matched_skills": [skill for skill in jd_skills if skill in resume_set],
+            "missing_skills": [skill for skill in jd_skills if skill not in resume_set]
+        }
+
+
+# Global instance
+_skill_extractor = None
+
+
+def get_skill_extractor() -> Optional[SkillExtractor]:
+    """Get or create global skill extractor (None when LLM extraction is configured)"""
+    global _skill_extractor
+    if os.getenv("SKILL_EXTRACTION", "local").lower() != "local":
+        return None
+    if _skill_extractor is None:
+        _skill_extractor = SkillExtractor.from_file(
+            os.getenv("SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH)
+        )
+    return _skill_extractor
@@ -0,0 +1,84 @@
+"""
+Helpers for streaming analyses as Server-Sent Events
+"""
+import json
+from typing import Any, List, Tuple
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format a Server-Sent Event
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        SSE frame
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class JSONListItemParser:
+    """Incrementally scans streamed JSON and reports completed list items
+
+    Only string items of arrays directly under the top-level object are
+    reported, e.g. ("resume_skills", "Python") as soon as the closing quote
+    of "Python" arrives.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buffer: List[str] = []
+        self._last_key = None
+        self._array_key = None
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Consume the next piece of JSON text
+
+        Args:
+            text: Raw JSON fragment
+
+        Returns:
+            List of (field, item) pairs completed by this fragment
+        """
+        items = []
+        for char in text:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    self._buffer.append(char)
+                elif char == "\\":
+                    self._escape = True
+                    self._buffer.append(char)
+                elif char == '"':
+                    self._in_string = False
+                    value = self._decode("".join(self._buffer))
+                    if self._depth == 2 and self._array_key is not None:
+                        items.append((self._array_key, value))
+                    elif self._depth == 1:
+                        self._last_key = value
+                else:
+                    self._buffer.append(char)
+            elif char == '"':
+                self._in_string = True
+                self._buffer = []
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2:
+                    self._array_key = self._last_key
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth < 2:
+                    self._array_key = None
+        return items
+
+    @staticmethod
+    def _decode(raw: str) -> str:
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            return raw
@@ -0,0 +1,129 @@
+"""
+Local stub of the OpenAI chat completions API for offline testing
+
+Injects configurable latency and 429 responses so retry, backoff and
+concurrency limits can be exercised without API spend.
+
+Usage:
+    python stub_openai.py
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python main.py
+"""
+import os
+import json
+import time
+import random
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "200"))
+STUB_RATE_LIMIT_RATIO = float(os.getenv("STUB_RATE_LIMIT_RATIO", "0.0"))
+STUB_RETRY_AFTER = os.getenv("STUB_RETRY_AFTER")
+
+DEFAULT_ANALYSIS = {
+    "resume_skills": ["Python", "FastAPI", "SQL"],
+    "jd_skills": ["Python", "AWS", "Docker", "SQL"],
+    "missing_skills": ["AWS", "Docker"],
+    "matched_skills": ["Python", "SQL"],
+    "strengths": ["Solid Python background"],
+    "suggestions": ["Add cloud deployment experience"],
+    "summary": "Stub analysis generated locally."
+}
+
+app = FastAPI(title="OpenAI stub")
+app.state.requests = 0
+app.state.rate_limited = 0
+app.state.in_flight = 0
+app.state.max_in_flight = 0
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Return a canned completion after the configured latency"""
+    body = await request.json()
+    app.state.requests += 1
+
+    if random.random() < STUB_RATE_LIMIT_RATIO:
+        app.state.rate_limited += 1
+        headers = {"retry-after": STUB_RETRY_AFTER} if STUB_RETRY_AFTER else {}
+        return JSONResponse(
+            status_code=429,
+            headers=headers,
+            content={"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}
+        )
+
+    content = json.dumps(DEFAULT_ANALYSIS)
+    if body.get("stream"):
+        return StreamingResponse(_stream_chunks(body, content), media_type="text/event-stream")
+
+    app.state.in_flight += 1
+    app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+    try:
+        await asyncio.sleep(STUB_LATENCY_MS / 1000)
+    finally:
+        app.state.in_flight -= 1
+
+    prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+
+    return {
+        "id": f"chatcmpl-stub-{app.state.requests}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+async def _stream_chunks(body: dict, content: str):
+    """Emit the canned completion as SSE chunks spread over the latency"""
+    pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+    delay = STUB_LATENCY_MS / 1000 / max(len(pieces), 1)
+
+    app.state.in_flight += 1
+    app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+    try:
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            chunk = {
+                "id": f"chatcmpl-stub-{app.state.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece},
+                    "finish_reason": "stop" if i == len(pieces) - 1 else None
+                }]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    finally:
+        app.state.in_flight -= 1
+
+
+@app.get("/stats")
+async def stats():
+    """Request counters for assertions in tests"""
+    return {
+        "requests": app.state.requests,
+        "rate_limited": app.state.rate_limited,
+        "max_in_flight": app.state.max_in_flight
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.getenv("STUB_PORT", "8100"))
+    print(f"Starting OpenAI stub on 127.0.0.1:{port}")
+    uvicorn.run(app, host="127.0.0.1", port=port)
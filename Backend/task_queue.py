@@ -0,0 +1,454 @@
+"""
+Durable local queue for asynchronous analyses
+
+Submitted tasks are stored in sqlite, so queued work survives restarts
+without an external broker, and a pool of background workers drains the
+queue at a fixed concurrency. A worker claims a task by taking a lease on it
+and renews the lease while the task runs; a task whose lease runs out
+(worker crashed or the process was killed) is claimed again. Failed attempts
+are retried with exponential backoff up to max_attempts. Several processes
+may share one database file.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from metrics import TASK_OUTCOMES, TASK_QUEUE_SECONDS, TASKS_RUNNING
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class PermanentTaskError(Exception):
+    """Raised by a task handler for failures that retrying cannot fix"""
+
+
+class ClaimedTask(NamedTuple):
+    """A task leased to a worker"""
+    task_id: str
+    payload: Dict[str, Any]
+    data: bytes
+    attempt: int
+
+
+class TaskQueue:
+    """sqlite-backed task queue with leases and retries"""
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 3,
+        lease_seconds: float = 30.0,
+        retry_backoff: float = 5.0,
+        retention_seconds: float = 24 * 3600
+    ):
+        """
+        Initialize queue
+
+        Args:
+            path: sqlite database file
+            max_attempts: Attempts before a task is marked failed
+            lease_seconds: How long a claimed task stays leased without renewal
+            retry_backoff: Delay before the first retry (doubles per attempt)
+            retention_seconds: How long finished tasks are kept for polling
+        """
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, data BLOB, "
+            "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, "
+            "lease_until REAL, available_at REAL NOT NULL, created REAL NOT NULL, "
+            "started REAL, finished REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, available_at)")
+
+    def submit(self, payload: Dict[str, Any], data: bytes = b"") -> str:
+        """
+        Add a task to the queue
+
+        Args:
+            payload: JSON-serializable task arguments
+            data: Binary input (e.g. the uploaded PDF)
+
+        Returns:
+            Task ID
+        """
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO tasks (task_id, status, payload, data, available_at, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (task_id, QUEUED, json.dumps(payload), data, now, now)
+            )
+        TASK_OUTCOMES.labels("submitted").inc()
+        return task_id
+
+    def claim(self, worker: str) -> Optional[ClaimedTask]:
+        """
+        Lease the oldest runnable task
+
+        Runnable tasks are queued tasks whose retry delay has passed and
+        running tasks whose lease expired. An expired task that already used
+        all its attempts is marked failed instead.
+
+        Args:
+            worker: Unique ID of the claiming worker
+
+        Returns:
+            ClaimedTask, or None if nothing is runnable
+        """
+        with self._lock:
+            while True:
+                now = time.time()
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        "SELECT task_id, status, payload, data, attempts, available_at FROM tasks "
+                        "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?) "
+                        "ORDER BY available_at LIMIT 1",
+                        (QUEUED, now, RUNNING, now)
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    task_id, status, payload, data, attempts, available_at = row
+                    if status == RUNNING:
+                        TASK_OUTCOMES.labels("recovered").inc()
+                        if attempts >= self.max_attempts:
+                            self._finish(task_id, FAILED, None, f"Worker stopped during attempt {attempts}")
+                            self._conn.execute("COMMIT")
+                            TASK_OUTCOMES.labels(FAILED).inc()
+                            continue
+
+                    self._conn.execute(
+                        "UPDATE tasks SET status = ?, owner = ?, lease_until = ?, attempts = attempts + 1, "
+                        "started = COALESCE(started, ?) WHERE task_id = ?",
+                        (RUNNING, worker, now + self.lease_seconds, now, task_id)
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+                if status == QUEUED:
+                    TASK_QUEUE_SECONDS.observe(now - available_at)
+                return ClaimedTask(task_id, json.loads(payload), data or b"", attempts + 1)
+
+    def renew(self, task_id: str, worker: str) -> bool:
+        """Extend a lease; returns False if the worker no longer holds the task"""
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE task_id = ? AND owner = ? AND status = ?",
+                (time.time() + self.lease_seconds, task_id, worker, RUNNING)
+            ).rowcount
+        return updated > 0
+
+    def complete(self, task_id: str, worker: str, result: Dict[str, Any]):
+        """Store the result of a task held by worker"""
+        with self._lock:
+            if self._finish(task_id, SUCCEEDED, json.dumps(result), None, worker):
+                TASK_OUTCOMES.labels(SUCCEEDED).inc()
+
+    def fail(self, task_id: str, worker: str, error: str, retry: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt of a task held by worker
+
+        Args:
+            task_id: Task ID
+            worker: Worker holding the task
+            error: Error message shown to the client
+            retry: Whether another attempt may succeed
+
+        Returns:
+            New status (queued when it will be retried), or None if the
+            worker no longer held the task
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM tasks WHERE task_id = ? AND owner = ? AND status = ?",
+                (task_id, worker, RUNNING)
+            ).fetchone()
+            if row is None:
+                return None
+
+            attempts = row[0]
+            if retry and attempts < self.max_attempts:
+                delay = self.retry_backoff * (2 ** (attempts - 1))
+                self._conn.execute(
+                    "UPDATE tasks SET status = ?, owner = NULL, lease_until = NULL, error = ?, "
+                    "available_at = ? WHERE task_id = ?",
+                    (QUEUED, error, time.time() + delay, task_id)
+                )
+                TASK_OUTCOMES.labels("retried").inc()
+                return QUEUED
+
+            self._finish(task_id, FAILED, None, error, worker)
+            TASK_OUTCOMES.labels(FAILED).inc()
+            return FAILED
+
+    def release(self, task_id: str, worker: str):
+        """Put a task back without counting the attempt (worker shutting down)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, owner = NULL, lease_until = NULL, attempts = attempts - 1 "
+                "WHERE task_id = ? AND owner = ? AND status = ?",
+                (QUEUED, task_id, worker, RUNNING)
+            )
+
+    def _finish(
+        self,
+        task_id: str,
+        status: str,
+        result: Optional[str],
+        error: Optional[str],
+        worker: Optional[str] = None
+    ) -> bool:
+        """Mark a task finished and drop its input (caller holds the lock)"""
+        query = (
+            "UPDATE tasks SET status = ?, result = ?, error = ?, data = NULL, owner = NULL, "
+            "lease_until = NULL, finished = ? WHERE task_id = ?"
+        )
+        params = [status, result, error, time.time(), task_id]
+        if worker is not None:
+            query += " AND owner = ? AND status = ?"
+            params += [worker, RUNNING]
+        return self._conn.execute(query, params).rowcount > 0
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Status of a task
+
+        Returns:
+            Task fields and, once succeeded, its result; None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, payload, result, error, attempts, created, started, finished "
+                "FROM tasks WHERE task_id = ?",
+                (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        status, payload, result, error, attempts, created, started, finished = row
+        return {
+            "task_id": task_id,
+            "status": status,
+            "payload": json.loads(payload),
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "attempts": attempts,
+            "created_at": created,
+            "started_at": started,
+            "finished_at": finished
+        }
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {**{status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}, **dict(rows)}
+
+    def purge(self) -> int:
+        """Delete finished tasks older than the retention period"""
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM tasks WHERE status IN (?, ?) AND finished < ?",
+                (SUCCEEDED, FAILED, time.time() - self.retention_seconds)
+            ).rowcount
+
+
+class TaskWorkers:
+    """Background coroutines that drain a TaskQueue"""
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        handler: Callable[[Dict[str, Any], bytes], Awaitable[Dict[str, Any]]],
+        concurrency: int = 2,
+        poll_interval: float = 1.0
+    ):
+        """
+        Initialize workers (started with start())
+
+        Args:
+            queue: Queue to drain
+            handler: Coroutine function run for each task with its payload and
+                data, returning the JSON-serializable result. It raises
+                PermanentTaskError for failures that must not be retried.
+            concurrency: Tasks processed at once
+            poll_interval: Idle delay between queue checks, also used by
+                long polls to notice tasks finished by other processes
+        """
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.prefix = uuid.uuid4().hex[:8]
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+        self._last_purge = 0.0
+        # Queue calls block on sqlite (up to its lock timeout when other
+        # processes write), so they run here; one connection needs one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="task-queue")
+
+    def start(self):
+        """Start the worker coroutines on the running event loop"""
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.prefix}-{index}"))
+            for index in range(self.concurrency)
+        ]
+        print(f"Started {self.concurrency} task workers")
+
+    async def stop(self):
+        """Stop the workers; tasks in progress go back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake an idle worker after a submit"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking TaskQueue method off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def submit(self, payload: Dict[str, Any], data: bytes = b"") -> str:
+        """Add a task to the queue and wake a worker; returns the task ID"""
+        task_id = await self.call(self.queue.submit, payload, data)
+        self.notify()
+        return task_id
+
+    async def wait(self, task_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll a task until it finishes or the timeout passes
+
+        Args:
+            task_id: Task ID
+            timeout: Longest time to wait in seconds
+
+        Returns:
+            Task status as returned by TaskQueue.get
+        """
+        deadline = time.monotonic() + timeout
+        self._waiters[task_id] = self._waiters.get(task_id, 0) + 1
+        try:
+            while True:
+                task = await self.call(self.queue.get, task_id)
+                remaining = deadline - time.monotonic()
+                if task is None or task["status"] in FINISHED or remaining <= 0:
+                    return task
+
+                finished = self._finished.setdefault(task_id, asyncio.Event())
+                try:
+                    await asyncio.wait_for(finished.wait(), min(remaining, self.poll_interval))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Tasks run by another process, or still running at the timeout,
+            # are never popped by this process's workers
+            self._waiters[task_id] -= 1
+            if self._waiters[task_id] == 0:
+                del self._waiters[task_id]
+                self._finished.pop(task_id, None)
+
+    async def _work(self, worker: str):
+        """Claim and run tasks until cancelled"""
+        while True:
+            await self._purge_finished()
+            claimed = await self.call(self.queue.claim, worker)
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            with TASKS_RUNNING.track_inprogress():
+                await self._run(worker, claimed)
+
+            finished = self._finished.pop(claimed.task_id, None)
+            if finished is not None:
+                finished.set()
+
+    async def _run(self, worker: str, claimed: ClaimedTask):
+        """Run one task, renewing its lease, and record the outcome"""
+        renewer = asyncio.create_task(self._renew(worker, claimed.task_id))
+        try:
+            result = await self.handler(claimed.payload, claimed.data)
+        except asyncio.CancelledError:
+            await self.call(self.queue.release, claimed.task_id, worker)
+            raise
+        except PermanentTaskError as e:
+            await self.call(self.queue.fail, claimed.task_id, worker, str(e), retry=False)
+        except Exception as e:
+            status = await self.call(self.queue.fail, claimed.task_id, worker, f"Analysis failed: {str(e)}")
+            print(f"Task {claimed.task_id} attempt {claimed.attempt} failed ({status}): {str(e)}")
+        else:
+            await self.call(self.queue.complete, claimed.task_id, worker, result)
+        finally:
+            renewer.cancel()
+
+    async def _renew(self, worker: str, task_id: str):
+        """Keep the lease of a running task alive"""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await self.call(self.queue.renew, task_id, worker):
+                return
+
+    async def _purge_finished(self):
+        """Drop expired finished tasks, at most once a minute"""
+        now = time.monotonic()
+        if now - self._last_purge >= 60:
+            self._last_purge = now
+            await self.call(self.queue.purge)
+
+
+# Global instance
+_task_queue = None
+
+
+def get_task_queue() -> TaskQueue:
+    """Get or create global task queue"""
+    global _task_queue
+    if _task_queue is None:
+        _task_queue = TaskQueue(
+            os.getenv("TASK_QUEUE_PATH", "storage/tasks.sqlite"),
+            max_attempts=int(os.getenv("TASK_MAX_ATTEMPTS", "3")),
+            lease_seconds=float(os.getenv("TASK_LEASE_SECONDS", "30")),
+            retry_backoff=float(os.getenv("TASK_RETRY_BACKOFF_SECONDS", "5")),
+            retention_seconds=float(os.getenv("TASK_RETENTION_HOURS", "24")) * 3600
+        )
+    return _task_queue
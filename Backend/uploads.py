@@ -0,0 +1,156 @@
+"""
+Size-bounded reading of uploaded PDFs
+
+Uploads are read in chunks: the PDF header is checked on the first chunk
+and reading stops as soon as the size limit is passed, so a bad or oversized
+file is rejected without being read in full. Small files stay in memory;
+larger ones are spooled to a temporary file that the PDF workers
+memory-map, so they are never copied into Python bytes.
+
+Kept free of FastAPI imports; anything with an async read(size) works.
+"""
+import os
+import hashlib
+import tempfile
+import weakref
+from typing import Any, Optional, Union
+
+# PDF readers accept the header anywhere in the first 1024 bytes
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+
+class UploadRejectedError(ValueError):
+    """Raised when an upload is not a PDF or is empty"""
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the size limit"""
+
+
+class PdfUpload:
+    """
+    An uploaded PDF, held in memory or spooled to a temporary file
+
+    The SHA-256 of the content is computed while reading, so caches can be
+    keyed without touching the content again. A spooled file is deleted on
+    close() or when the object is garbage collected.
+    """
+
+    def __init__(self, digest: str, size: int, content: Optional[bytes] = None, path: Optional[str] = None):
+        self.digest = digest
+        self.size = size
+        self.content = content
+        self.path = path
+        self._cleanup = weakref.finalize(self, _remove, path) if path is not None else None
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "PdfUpload":
+        """Wrap PDF bytes that are already in memory"""
+        return cls(hashlib.sha256(content).hexdigest(), len(content), content=content)
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """What to pass to pdf_extractor: the bytes, or the spooled file's path"""
+        return self.content if self.content is not None else self.path
+
+    def read_bytes(self) -> bytes:
+        """Full content as bytes (reads a spooled file)"""
+        if self.content is not None:
+            return self.content
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        """Delete the spooled file, if any"""
+        if self._cleanup is not None:
+            self._cleanup()
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def read_pdf_upload(
+    stream: Any,
+    max_bytes: int,
+    spool_threshold: int = 1024 * 1024,
+    spool_dir: Optional[str] = None,
+    chunk_size: int = 256 * 1024
+) -> PdfUpload:
+    """
+    Read an uploaded PDF in chunks
+
+    Args:
+        stream: Upload with an async read(size), e.g. a FastAPI UploadFile
+        max_bytes: Largest accepted file
+        spool_threshold: Files larger than this are spooled to disk (at least
+            PDF_HEADER_WINDOW)
+        spool_dir: Directory for spooled files (system temp dir when None)
+        chunk_size: Bytes read at a time
+
+    Returns:
+        PdfUpload
+
+    Raises:
+        UploadRejectedError: If the file is empty or not a PDF
+        UploadTooLargeError: As soon as more than max_bytes have been read
+    """
+    # Spooled chunks skip the header check, so the header is always read into memory first
+    spool_threshold = max(spool_threshold, PDF_HEADER_WINDOW)
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    size = 0
+
+    try:
+        while True:
+            chunk = await stream.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"File is larger than the {max_bytes} byte limit")
+            digest.update(chunk)
+
+            if spool is not None:
+                spool.write(chunk)
+                continue
+
+            buffer += chunk
+            # Check the header once enough of the file is here, before reading the rest
+            if size - len(chunk) < PDF_HEADER_WINDOW <= size:
+                _check_header(buffer)
+            if size > spool_threshold:
+                if spool_dir:
+                    os.makedirs(spool_dir, exist_ok=True)
+                spool = tempfile.NamedTemporaryFile(
+                    prefix="upload-", suffix=".pdf", dir=spool_dir or None, delete=False
+                )
+                spool.write(buffer)
+                buffer = bytearray()
+
+        if size == 0:
+            raise UploadRejectedError("Uploaded file is empty")
+        if size < PDF_HEADER_WINDOW:
+            _check_header(buffer)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            _remove(spool.name)
+        raise
+
+    digest = digest.hexdigest()
+    if spool is None:
+        return PdfUpload(digest, size, content=bytes(buffer))
+    spool.close()
+    return PdfUpload(digest, size, path=spool.name)
+
+
+def _check_header(head: bytes):
+    if PDF_MAGIC not in bytes(head[:PDF_HEADER_WINDOW]):
+        raise UploadRejectedError("File is not a PDF")
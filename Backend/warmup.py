@@ -0,0 +1,111 @@
+"""
+Background service warmup and readiness tracking
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from metrics import SERVICE_READY, WARMUP_SECONDS
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"
+
+
+class ServiceState:
+    """Warmup state of one service"""
+
+    def __init__(self, name: str, loader: Callable[[], Any], required: bool):
+        self.name = name
+        self.loader = loader
+        self.required = required
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """State as a JSON-serializable dict"""
+        state = {"status": self.status, "required": self.required}
+        if self.seconds is not None:
+            state["warmup_seconds"] = round(self.seconds, 3)
+        if self.error is not None:
+            state["error"] = self.error
+        return state
+
+
+class Warmup:
+    """Loads services one after another off the event loop
+
+    Loaders run in registration order, so a service may rely on ones
+    registered before it. A loader returning False marks its service as
+    disabled (e.g. local skill extraction switched off by configuration).
+    """
+
+    def __init__(self):
+        self.services: "OrderedDict[str, ServiceState]" = OrderedDict()
+
+    def register(self, name: str, loader: Callable[[], Any], required: bool = True):
+        """
+        Add a service to warm up
+
+        Args:
+            name: Service name reported by /ready
+            loader: Blocking function that loads and warms the service
+            required: Whether readiness waits for this service
+        """
+        self.services[name] = ServiceState(name, loader, required)
+        SERVICE_READY.labels(name).set(0)
+
+    async def run(self, run_blocking: Callable[..., Awaitable[Any]]):
+        """
+        Load every registered service
+
+        Args:
+            run_blocking: Coroutine function that runs a blocking callable
+                in a worker thread, e.g. StageExecutors.run_embedding
+        """
+        for service in self.services.values():
+            service.status = LOADING
+            start = time.perf_counter()
+            try:
+                result = await run_blocking(service.loader)
+            except Exception as e:
+                service.status = FAILED
+                service.error = str(e)
+                print(f"✗ {service.name} failed to load: {str(e)}")
+                continue
+            finally:
+                service.seconds = time.perf_counter() - start
+                WARMUP_SECONDS.labels(service.name).set(service.seconds)
+
+            service.status = DISABLED if result is False else READY
+            SERVICE_READY.labels(service.name).set(1)
+            print(f"✓ {service.name} {service.status} in {service.seconds:.2f}s")
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """
+        Whether one service, or every required service, is usable
+
+        Args:
+            name: Service to check (None for overall readiness)
+        """
+        if name is not None:
+            return self.services[name].status in (READY, DISABLED)
+        return all(
+            service.status in (READY, DISABLED)
+            for service in self.services.values()
+            if service.required
+        )
+
+    def has_failed(self) -> bool:
+        """Whether a required service failed to load"""
+        return any(
+            service.status == FAILED
+            for service in self.services.values()
+            if service.required
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Per-service states for the readiness endpoint"""
+        return {name: service.as_dict() for name, service in self.services.items()}
@@ -1,12 +1,67 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import gradio as gr
 import requests
+from requests.adapters import HTTPAdapter
 
-BACKEND_URL = "http://127.0.0.1:8000/analyze"
+API_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
+STREAM_URL = f"{API_URL}/analyze/stream"
+
+# Resumes uploaded and analyzed at the same time in multi-resume mode
+UI_CONCURRENCY = int(os.getenv("UI_CONCURRENCY", "4"))
+# Long-poll interval for queued analyses (the backend caps it at TASK_MAX_WAIT_SECONDS)
+TASK_POLL_SECONDS = 25
+# A resume still unfinished after this long is reported as an error
+# (e.g. no task workers are running on the backend)
+UI_FILE_TIMEOUT_SECONDS = float(os.getenv("UI_FILE_TIMEOUT_SECONDS", "600"))
+
+RESULT_HEADERS = ["File", "Match Score", "Status", "Latency (s)", "Matched Skills", "Missing Skills", "Summary"]
+
+# One pooled session, so concurrent submissions and polls reuse connections
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=UI_CONCURRENCY))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=UI_CONCURRENCY))
+
+STAGE_LABELS = {
+    "extracted": "📄 Text extracted",
+    "retrieved": "🔎 Relevant sections retrieved",
+}
+FIELD_LABELS = {
+    "resume_skills": "🧾 Resume Skills",
+    "jd_skills": "📋 Job Skills",
+    "matched_skills": "✅ Matched Skills",
+    "missing_skills": "⚠️ Missing Skills",
+    "strengths": "💪 Strengths",
+    "suggestions": "💡 Suggestions",
+}
+
+
+def iter_sse(response):
+    """Yield (event, data) pairs from a Server-Sent Events response"""
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+
+def format_progress(stages, items):
+    """Render what has arrived so far"""
+    lines = [STAGE_LABELS.get(stage, stage) for stage in stages]
+    if not items:
+        lines.append("🤖 Analyzing with AI...")
+    for field, values in items.items():
+        lines.append(f"\n{FIELD_LABELS.get(field, field)}:\n{', '.join(values)}")
+    return "\n".join(lines)
 
 
 def analyze_resume(resume_file, job_description):
     if resume_file is None:
-        return "Please upload a resume."
+        yield "Please upload a resume."
+        return
 
     # Gradio gives file path, so open manually
     with open(resume_file, "rb") as f:
@@ -18,13 +73,30 @@ def analyze_resume(resume_file, job_description):
         "job_description": job_description
     }
 
-    response = requests.post(BACKEND_URL, files=files, data=data, timeout=120)
+    yield "⏳ Uploading resume..."
 
-    if response.status_code != 200:
-        return f"Backend error: {response.status_code}\n{response.text}"
+    stages, items = [], {}
+    with requests.post(STREAM_URL, files=files, data=data, stream=True, timeout=120) as response:
+        if response.status_code != 200:
+            yield f"Backend error: {response.status_code}\n{response.text}"
+            return
+
+        for event, payload in iter_sse(response):
+            if event == "stage":
+                stages.append(payload["stage"])
+                yield format_progress(stages, items)
+            elif event == "item":
+                items.setdefault(payload["field"], []).append(payload["value"])
+                yield format_progress(stages, items)
+            elif event == "result":
+                yield format_result(payload)
+                return
+            elif event == "error":
+                yield f"Backend error: {payload['status_code']}\n{payload['detail']}"
+                return
 
-    r = response.json()
 
+def format_result(r):
     strengths = "\n- ".join(r["strengths"])
     suggestions = "\n- ".join(r["suggestions"])
 
@@ -50,18 +122,141 @@ def analyze_resume(resume_file, job_description):
     return output
 
 
+def register_job(job_description):
+    """Register the job description once so each resume only sends its job_id"""
+    response = session.post(f"{API_URL}/jobs", json={"job_description": job_description}, timeout=120)
+    if response.status_code != 200:
+        # Older backends without /jobs: send the text with every resume
+        return {"job_description": job_description}
+    return {"job_id": response.json()["job_id"]}
+
+
+def analyze_one(path, job):
+    """Queue one resume and wait for its result; returns a table row"""
+    name = os.path.basename(path)
+    start = time.perf_counter()
+
+    def row(score, status, matched="", missing="", summary=""):
+        return [name, score, status, round(time.perf_counter() - start, 2), matched, missing, summary]
+
+    try:
+        with open(path, "rb") as f:
+            response = session.post(
+                f"{API_URL}/analyze/async",
+                files={"resume": (name, f, "application/pdf")},
+                data=job,
+                timeout=120
+            )
+        if response.status_code != 202:
+            return row(None, "error", summary=f"{response.status_code}: {response.text}")
+        task_id = response.json()["task_id"]
+        deadline = start + UI_FILE_TIMEOUT_SECONDS
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return row(None, "timeout", summary=f"No result after {UI_FILE_TIMEOUT_SECONDS:.0f}s (task {task_id})")
+            wait = min(TASK_POLL_SECONDS, remaining)
+            response = session.get(
+                f"{API_URL}/tasks/{task_id}",
+                params={"wait": wait},
+                timeout=wait + 30
+            )
+            if response.status_code != 200:
+                return row(None, "error", summary=f"{response.status_code}: {response.text}")
+            task = response.json()
+            if task["status"] == "failed":
+                return row(None, "failed", summary=task["error"] or "")
+            if task["status"] == "succeeded":
+                r = task["result"]
+                return row(
+                    r["match_score"],
+                    "done",
+                    ", ".join(r["matched_skills"]),
+                    ", ".join(r["missing_skills"]),
+                    r["summary"]
+                )
+    except requests.RequestException as e:
+        return row(None, "error", summary=str(e))
+
+
+def collect_pdfs(files, folder):
+    """PDF paths from the multi-file picker and the folder picker, without duplicates"""
+    paths = [path for path in (files or []) + (folder or []) if path.lower().endswith(".pdf")]
+    return list(dict.fromkeys(paths))
+
+
+def format_status(done, total, rows):
+    latencies = [r[3] for r in rows]
+    status = f"Processed {done}/{total} resumes"
+    if latencies:
+        status += f" · mean latency {sum(latencies) / len(latencies):.1f}s · slowest {max(latencies):.1f}s"
+    return status
+
+
+def analyze_many(files, folder, job_description):
+    """Analyze many resumes concurrently, adding each row to the table as it finishes"""
+    paths = collect_pdfs(files, folder)
+    if not paths:
+        yield "Please upload at least one PDF resume.", []
+        return
+    if not job_description or len(job_description.strip()) < 10:
+        yield "Please paste a job description.", []
+        return
+
+    yield f"⏳ Registering job description and uploading {len(paths)} resumes...", []
+    try:
+        job = register_job(job_description)
+    except requests.RequestException as e:
+        yield f"Backend error: {e}", []
+        return
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=UI_CONCURRENCY) as pool:
+        futures = [pool.submit(analyze_one, path, job) for path in paths]
+        for future in as_completed(futures):
+            rows.append(future.result())
+            # Best matches first; failed rows last
+            rows.sort(key=lambda r: -1 if r[1] is None else r[1], reverse=True)
+            yield format_status(len(rows), len(paths), rows), rows
+
+
 with gr.Blocks() as demo:
     gr.Markdown("# 🚀 AI Resume Analyzer")
-    gr.Markdown("Upload your resume and paste Job Description to see your match score.")
 
-    with gr.Row():
-        resume = gr.File(label="Upload Resume (PDF)")
-        jd = gr.Textbox(lines=12, label="Job Description")
+    with gr.Tab("Single resume"):
+        gr.Markdown("Upload your resume and paste Job Description to see your match score.")
+
+        with gr.Row():
+            resume = gr.File(label="Upload Resume (PDF)")
+            jd = gr.Textbox(lines=12, label="Job Description")
+
+        analyze = gr.Button("Analyze Resume", variant="primary")
+
+        result = gr.Textbox(lines=20, label="Result")
+
+        analyze.click(analyze_resume, inputs=[resume, jd], outputs=result)
+
+    with gr.Tab("Multiple resumes"):
+        gr.Markdown("Upload several resumes or a whole folder; results appear as each one finishes.")
+
+        with gr.Row():
+            with gr.Column():
+                resumes = gr.File(label="Upload Resumes (PDF)", file_count="multiple", file_types=[".pdf"])
+                folder = gr.File(label="Or Upload a Folder", file_count="directory")
+            batch_jd = gr.Textbox(lines=12, label="Job Description")
 
-    analyze = gr.Button("Analyze Resume", variant="primary")
+        analyze_all = gr.Button("Analyze Resumes", variant="primary")
 
-    result = gr.Textbox(lines=20, label="Result")
+        batch_status = gr.Markdown()
+        table = gr.Dataframe(
+            headers=RESULT_HEADERS,
+            datatype=["str", "number", "str", "number", "str", "str", "str"],
+            interactive=False,
+            wrap=True,
+            label="Results (click a column header to sort)"
+        )
 
-    analyze.click(analyze_resume, inputs=[resume, jd], outputs=result)
+        analyze_all.click(analyze_many, inputs=[resumes, folder, batch_jd], outputs=[batch_status, table])
 
 demo.launch()
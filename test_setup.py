@@ -151,6 +151,152 @@ def test_faiss():
         return False
 
 
+def test_rag_isolation():
+    """Test that concurrent analyses never see each other's resume chunks"""
+    print("\nTesting RAG isolation under concurrent load...")
+    
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Backend"))
+        from rag import RAGService
+        
+        rag_service = RAGService(pool_size=4)
+        job_description = "Looking for an engineer with strong project experience"
+        
+        def run(i):
+            marker = f"candidate{i:03d}"
+            resume = " ".join(
+                f"{marker} delivered project {j} using tool{i}x{j}." for j in range(60)
+            )
+            _, chunks = rag_service.process_and_retrieve(resume, job_description, k=3)
+            context = " ".join(chunks)
+            foreign = [
+                token for token in context.split()
+                if token.startswith("candidate") and token != marker
+            ]
+            return marker in context and not foreign
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(run, range(64)))
+        
+        if not all(results):
+            print(f"❌ {results.count(False)} of {len(results)} analyses saw foreign chunks")
+            return False
+        
+        print(f"✓ {len(results)} concurrent analyses kept isolated contexts")
+        print("\n✅ RAG isolation working correctly!")
+        return True
+        
+    except Exception as e:
+        print(f"❌ RAG isolation test failed: {str(e)}")
+        return False
+
+
+def test_candidate_index_reload():
+    """Test that a saved candidate index can be reloaded and appended to"""
+    print("\nTesting candidate index reload and append...")
+    
+    try:
+        import tempfile
+        import numpy as np
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Backend"))
+        from candidate_index import CandidateIndex
+        
+        dimension = 16
+        rng = np.random.default_rng(0)
+        
+        def add(index, count):
+            for i in range(count):
+                index.add_candidate(f"candidate{i}.pdf", ["chunk a", "chunk b"], rng.random((2, dimension)))
+        
+        for index_type in ("flat", "hnsw", "ivf"):
+            with tempfile.TemporaryDirectory() as index_dir:
+                # ivf_nlist=2 is trained once 78 vectors exist
+                index = CandidateIndex(dimension, index_dir, index_type, ivf_nlist=2, ivf_nprobe=2)
+                add(index, 50)
+                reloaded = CandidateIndex(dimension, index_dir, index_type, ivf_nlist=2, ivf_nprobe=2)
+                add(reloaded, 5)
+                
+                again = CandidateIndex(dimension, index_dir, index_type, ivf_nlist=2, ivf_nprobe=2)
+                if again.index.ntotal != 110 or again.total_candidates != 55:
+                    print(f"❌ {index_type}: expected 110 vectors, found {again.index.ntotal}")
+                    return False
+                print(f"✓ {index_type} index reloaded and appended ({type(again.index).__name__})")
+        
+        print("\n✅ Candidate index persistence working!")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Candidate index test failed: {str(e)}")
+        return False
+
+
+def test_llm_resilience():
+    """Test LLM retries and concurrency limiting against the local OpenAI stub"""
+    print("\nTesting LLM retry/backoff against local stub...")
+    
+    saved_env = dict(os.environ)
+    try:
+        import asyncio
+        import threading
+        import time
+        import uvicorn
+        
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Backend"))
+        import stub_openai
+        from llm import LLMService
+        
+        os.environ.update({
+            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "sk-stub",
+            "OPENAI_BASE_URL": "http://127.0.0.1:8199/v1",
+            "LLM_MAX_IN_FLIGHT": "4",
+            "LLM_MAX_RETRIES": "10",
+            "LLM_BACKOFF_BASE": "0.05",
+        })
+        stub_openai.STUB_LATENCY_MS = 50
+        stub_openai.STUB_RATE_LIMIT_RATIO = 0.3
+        
+        server = uvicorn.Server(uvicorn.Config(stub_openai.app, port=8199, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        
+        llm_service = LLMService()
+        
+        async def run():
+            calls = [
+                llm_service.analyze_resume_vs_job_async(f"resume {i}", "job description", use_cache=False)
+                for i in range(20)
+            ]
+            results = await asyncio.gather(*calls, return_exceptions=True)
+            await llm_service.aclose()
+            return results
+        
+        results = asyncio.run(run())
+        server.should_exit = True
+        
+        failures = [r for r in results if not isinstance(r, dict)]
+        if failures:
+            print(f"❌ {len(failures)} of {len(results)} calls failed: {failures[0]}")
+            return False
+        
+        if stub_openai.app.state.max_in_flight > 4:
+            print(f"❌ In-flight limit exceeded: {stub_openai.app.state.max_in_flight}")
+            return False
+        
+        print(f"✓ {len(results)} calls succeeded despite {stub_openai.app.state.rate_limited} injected 429s")
+        print(f"✓ Peak in-flight requests: {stub_openai.app.state.max_in_flight}")
+        print("\n✅ LLM retry and concurrency limiting working!")
+        return True
+        
+    except Exception as e:
+        print(f"❌ LLM resilience test failed: {str(e)}")
+        return False
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
 def main():
     """Run all tests"""
     print("="*60)
@@ -162,6 +308,9 @@ def main():
         "Environment": test_environment(),
         "Embedding Model": test_embedding_model(),
         "FAISS": test_faiss(),
+        "RAG Isolation": test_rag_isolation(),
+        "Candidate Index": test_candidate_index_reload(),
+        "LLM Resilience": test_llm_resilience(),
     }
     
     # Only test OpenAI if API key is configured